@@ -1,14 +1,22 @@
 # Ai_Player.py
 
+import time
+
 class AI_Player:
-    def __init__(self, color, imp_algorithm):
+    def __init__(self, color, imp_algorithm, opening_book=None, time_manager=None):
         """
         AI player wrapper.
         :param color: 1 or 2 (player color)
         :param imp_algorithm: search engine instance (Minimax or AlphaBeta)
+        :param opening_book: optional opening_book.OpeningBook consulted before searching
+        :param time_manager: optional timecontrol.TimeManager that sets each search's time limit
         """
         self.color = color
         self.imp = imp_algorithm
+        self.opening_book = opening_book
+        self.time_manager = time_manager
+        # stats.SearchStats of the last search, if the engine collects them
+        self.last_stats = None
 
     def make_move(self, board_obj, opp_color=None, first_move_single=False, moves_played=0):
         """
@@ -23,8 +31,23 @@ class AI_Player:
         if opp_color is None:
             opp_color = 1 if self.color == 2 else 2
 
+        # Known opening position: play the book move without searching
+        best_move, score = None, None
+        if self.opening_book is not None:
+            best_move = self.opening_book.lookup(board_obj)
+
         # Ask the search algorithm for the best move
-        best_move, score = self.imp.choose_move(board_obj, self.color, opp_color)
+        self.last_stats = None
+        if not best_move:
+            if self.time_manager is not None:
+                # Set it on the engine itself, not on a Ponderer wrapping it
+                engine = getattr(self.imp, "engine", self.imp)
+                engine.time_limit_sec = self.time_manager.allocate(board_obj)
+            start = time.monotonic()
+            best_move, score = self.imp.choose_move(board_obj, self.color, opp_color)
+            if self.time_manager is not None:
+                self.time_manager.spend(time.monotonic() - start)
+            self.last_stats = getattr(self.imp, "stats", None)
 
         if not best_move:
             return None, None
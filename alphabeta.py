@@ -1,8 +1,81 @@
 # alphabeta.py
 
+import copy
+import math
+import multiprocessing
+import threading
 import time
-from itertools import combinations
-from heuristics import longest_chain_open
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from candidates import CandidateGenerator, creates_block, stream_moves
+from threats import ThreatSolver
+from stats import SearchStats
+from timecontrol import SearchTimeout, next_iteration_cost
+from transposition import make_table, evaluator_tag, EXACT, LOWER, UPPER, SIDE_KEY
+
+# Per-process state for parallel root search, set up by _init_worker
+_worker_engine = None
+_worker_alpha = None
+_worker_search = None  # search_id of the root search the worker last took a chunk of
+
+
+def _init_worker(config, shared_alpha, shared_stop):
+    global _worker_engine, _worker_alpha
+    _worker_engine = AlphaBeta(**config)
+    _worker_engine._shared_stop = shared_stop
+    _worker_alpha = shared_alpha
+
+
+def _search_root_chunk(board_obj, combos, max_depth, my_player, opp_player, deadline, alpha, search_id,
+                       node_limit=None):
+    """
+    Search a slice of the root moves in a worker process. Each child is searched
+    with the best root score found so far by any worker as its alpha bound;
+    under a node limit the chunk keeps its starting alpha and its share of
+    the nodes, so the run repeats exactly. Returns (move, score, nodes,
+    completed).
+    """
+    global _worker_search
+    engine = _worker_engine
+    engine.max_depth = max_depth
+    engine.nodes = 0
+    engine.node_limit = node_limit
+    if engine.tt is not None and search_id != _worker_search:
+        # Age the table once per root search, not per chunk, so entries the
+        # worker stored for earlier chunks of this move stay first-class
+        _worker_search = search_id
+        if engine.tt_path is None:
+            engine.tt.new_search()
+        else:
+            engine.tt.sync_age()  # the parent already aged the shared file
+    if node_limit is not None:
+        # Which worker gets which chunk varies, so start every chunk from the same state
+        engine.history, engine.killers = {}, []
+        if engine.tt is not None and engine.tt_path is None:
+            engine.tt.clear()
+    board = engine._search_board(board_obj)
+    best_move, best_score = None, float('-inf')
+    for combo in combos:
+        if engine._out_of_time(deadline):
+            return best_move, best_score, engine.nodes, False
+        if node_limit is None:
+            alpha = max(alpha, _worker_alpha.value)
+        board.apply_pair(combo, my_player)
+        try:
+            _, score = engine.alphabeta(board, 1, alpha, float('inf'), False, my_player, opp_player, deadline)
+        except SearchTimeout:
+            return best_move, best_score, engine.nodes, False
+        board.undo_pair(combo)
+        if score is None:
+            continue
+        if best_move is None or score > best_score:
+            best_score, best_move = score, combo
+        if node_limit is None and score > alpha:
+            with _worker_alpha.get_lock():
+                if score > _worker_alpha.value:
+                    _worker_alpha.value = score
+    return best_move, best_score, engine.nodes, True
+
 
 class AlphaBeta:
     def __init__(self,
@@ -12,7 +85,19 @@ class AlphaBeta:
                  win_k=6,
                  near_radius=2,
                  iterative_deepening=True,
-                 time_limit_sec=2.0):
+                 time_limit_sec=2.0,
+                 tt_buckets=1 << 18,
+                 max_candidates=None,
+                 workers=1,
+                 aspiration_window=50,
+                 batch_evaluator=None,
+                 threat_budget=500,
+                 quiescence_budget=0,
+                 collect_stats=False,
+                 node_limit=None,
+                 poll_interval=64,
+                 tt_path=None,
+                 board_cls=None):
         self.max_depth = max_depth
         self.heuristic_func = heuristic_func
         self.stones_per_move = stones_per_move
@@ -20,6 +105,95 @@ class AlphaBeta:
         self.near_radius = near_radius
         self.iterative_deepening = iterative_deepening
         self.time_limit_sec = time_limit_sec
+        self.tt_buckets = tt_buckets
+        self.max_candidates = max_candidates
+        # tt_path keeps the table in a file shared across moves, games and
+        # processes; the tag keeps other engines' scores apart within it
+        self.tt_path = tt_path
+        # board_cls (e.g. bitboard.BitBoard) to search on instead of the caller's board class
+        self.board_cls = board_cls
+        heuristic_name = evaluator_tag(heuristic_func)
+        if batch_evaluator is not None:
+            # Batched leaves are scored on the evaluator's scale, not heuristic_func's
+            weights = getattr(batch_evaluator, "weights", ())
+            heuristic_name += f"+{type(batch_evaluator).__name__}{[float(w) for w in weights]}"
+        self.tt = make_table(tt_buckets, tt_path,
+                             tag=f"{type(self).__name__}:{heuristic_name}:{win_k}:{max_candidates}")
+        # Top-K cell pruning for pair generation; None searches every pair
+        self.candidates = CandidateGenerator(max_candidates, win_k) if max_candidates else None
+        self.threat_cache_size = 1 << 16
+        self._threat_cache = {}
+        # Set by stop() to abort a running search (e.g. a cancelled ponder)
+        self._stop_event = threading.Event()
+        # Search effort of the last choose_move: nodes visited, and
+        # (depth, nodes, seconds) for each completed iterative-deepening depth
+        self.nodes = 0
+        self.depth_log = []
+        # Called as on_iteration(depth, score, nodes, seconds, move) after each
+        # completed depth, e.g. to report progress while the search runs
+        self.on_iteration = None
+        # collect_stats=True leaves a stats.SearchStats for each search in self.stats
+        self.collect_stats = collect_stats
+        self.stats = None
+        # node_limit: stop after that many nodes instead of on the clock, for
+        # reproducible runs. The clock and stop() are checked every poll_interval nodes.
+        self.node_limit = node_limit
+        self.poll_interval = poll_interval
+        # workers > 1 splits the root moves across a process pool
+        self.workers = workers
+        self._pool = None
+        self._shared_alpha = None
+        # Set to 1 by stop() so running root chunks in the workers give up too
+        self._shared_stop = None
+        self._search_id = 0    # choose_move calls so far; workers age their table once per search
+        # Move-ordering state carried between iterative-deepening iterations
+        self.aspiration_window = aspiration_window
+        self.pv = []           # principal variation of the last completed iteration
+        self.killers = []      # per ply: the two most recent cutoff moves
+        self.history = {}      # cell index -> accumulated cutoff bonus
+        self._area = 0         # cells on the board being searched; splits move codes
+        # Optional batch_eval.BatchEvaluator: scores all children of a
+        # depth == max_depth - 1 node in one pass instead of heuristic_func
+        self.batch_evaluator = batch_evaluator
+        # Forced-win search: threat_budget nodes before the main search,
+        # quiescence_budget nodes for a one-move check at every leaf; 0 disables.
+        # The leaf check rescans the whole board at every leaf, so it is off by default
+        self.threat_budget = threat_budget
+        self.quiescence_budget = quiescence_budget
+        self.threat_solver = ThreatSolver(win_k, stones_per_move) if threat_budget or quiescence_budget else None
+
+    def stop(self):
+        """Ask a running choose_move to return as soon as possible."""
+        self._stop_event.set()
+        if self._shared_stop is not None:
+            self._shared_stop.value = 1
+
+    def resume(self):
+        """Clear a previous stop() so the next search runs normally."""
+        self._stop_event.clear()
+        if self._shared_stop is not None:
+            self._shared_stop.value = 0
+
+    def _stopped(self):
+        if self._stop_event.is_set():
+            return True
+        return self._shared_stop is not None and self._shared_stop.value == 1
+
+    def _out_of_time(self, deadline):
+        return time.monotonic() >= deadline or self._stopped()
+
+    def _poll(self, deadline):
+        """Count a node and abort the search once its node or time budget is used up."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        if self.nodes % self.poll_interval == 0 and self._out_of_time(deadline):
+            raise SearchTimeout()
+
+    def _timed(self, phase, func, *args, **kwargs):
+        if self.stats is None:
+            return func(*args, **kwargs)
+        return self.stats.timed(phase, func, *args, **kwargs)
 
     def _is_near_stone(self, board_grid, r, c, radius=None):
         if radius is None:
@@ -34,24 +208,49 @@ class AlphaBeta:
 
     def _creates_block(self, board_grid, move, opp_player):
         r, c = move
-        board_grid[r][c] = opp_player
-        length, open_ends = longest_chain_open(board_grid, opp_player)
-        board_grid[r][c] = 0
-        return length >= self.win_k - 1 and open_ends > 0
+        return creates_block(board_grid, r, c, opp_player, self.win_k)
 
-    def get_moves(self, board_grid, opp_player=None):
+    def _threat_map(self, board_obj, moves, opp_player):
+        """
+        Cells among moves where the opponent would make an open (win_k - 1)-line,
+        cached per position so revisiting a node does not recompute it.
+        """
+        key = (board_obj.hash, opp_player)
+        blocks = self._threat_cache.get(key)
+        if blocks is None:
+            if len(self._threat_cache) >= self.threat_cache_size:
+                self._threat_cache.clear()
+            blocks = {m for m in moves if self._creates_block(board_obj.grid, m, opp_player)}
+            self._threat_cache[key] = blocks
+        return blocks
+
+    def get_moves(self, board_obj, opp_player=None):
+        return self._order_cells(board_obj, self._near_cells(board_obj), opp_player)
+
+    def _near_cells(self, board_obj):
+        """Empty cells within near_radius of a stone (every cell on an empty board)."""
+        if board_obj.near_radius == self.near_radius:
+            # The board keeps this set up to date in apply_move/undo_move
+            return board_obj.candidate_cells()
+        board_grid = board_obj.grid
         N = len(board_grid)
         moves = []
-        any_stone = any(board_grid[r][c] != 0 for r in range(N) for c in range(N))
+        any_stone = board_obj.stone_count > 0
         for r in range(N):
             for c in range(N):
                 if board_grid[r][c] == 0:
                     if not any_stone or self._is_near_stone(board_grid, r, c):
                         moves.append((r, c))
+        return moves
+
+    def _order_cells(self, board_obj, moves, opp_player=None):
+        """Sort cells in place: blocks of the opponent's open lines first, then by centre distance."""
+        N = board_obj.size
         center_r, center_c = N // 2, N // 2
         if opp_player is not None:
+            blocks = self._threat_map(board_obj, moves, opp_player)
             moves.sort(key=lambda m: (
-                0 if self._creates_block(board_grid, m, opp_player) else 1,
+                0 if m in blocks else 1,
                 abs(m[0]-center_r) + abs(m[1]-center_c)
             ))
         else:
@@ -59,65 +258,471 @@ class AlphaBeta:
         return moves
 
     def evaluate_terminal(self, board_obj, my_player, opp_player, depth):
-        if board_obj.check_win(my_player):
+        winner = self._timed("terminal", board_obj.last_winner)
+        if winner == my_player:
             return float('inf') - depth
-        if board_obj.check_win(opp_player):
+        if winner == opp_player:
             return float('-inf') + depth
-        moves = self.get_moves(board_obj.grid, opp_player)
-        if depth >= self.max_depth or not moves:
-            return self.heuristic_func(board_obj.grid, my_player, opp_player,
-                                       win_k=self.win_k, depth=depth)
+        if depth >= self.max_depth or self._timed("terminal", board_obj.check_draw):
+            return self._timed("evaluation", self.heuristic_func, board_obj.grid, my_player, opp_player,
+                               win_k=self.win_k, depth=depth)
         return None
 
+    def _move_combinations(self, board_obj, mover, other, opp_player):
+        """
+        All k-stone moves, or the candidate generator's pruned and ordered
+        list, as Board.encode_move codes.
+        """
+        if self.candidates is None:
+            moves = self.get_moves(board_obj, opp_player)
+            k = min(self.stones_per_move, len(moves))
+            combos = combinations(moves, k) if k > 0 else ()
+        else:
+            moves = self.get_moves(board_obj)
+            k = min(self.stones_per_move, len(moves))
+            combos = self.candidates.combos(board_obj.grid, moves, k, mover, other)
+        encode = board_obj.encode_move
+        return [encode(combo) for combo in combos]
+
+    def _move_stream(self, board_obj, opp_player, depth, tt_move):
+        """
+        Full-width search (no candidate generator): the moves of this node as
+        a lazy stream, TT, PV and killer moves first, then pairs best first
+        by history and cell order, so a cutoff stops pair generation.
+        """
+        moves = self._timed("movegen", self._near_cells, board_obj)
+        moves = self._timed("ordering", self._order_cells, board_obj, moves, opp_player)
+        k = min(self.stones_per_move, len(moves))
+        if k <= 0:
+            return iter(())
+        front = [tt_move]
+        if depth < len(self.pv):
+            front.append(self.pv[depth])
+        if depth < len(self.killers):
+            front.extend(self.killers[depth])
+        stream = stream_moves(moves, k, board_obj.size, front, self.history)
+        # Pairs are made as the search takes them, so that is where movegen time goes
+        return stream if self.stats is None else self.stats.timed_iter("movegen", stream)
+
+    def _order_tt_move(self, move_combinations, tt_move):
+        """Move the transposition-table best move to the front, if present."""
+        if tt_move is not None and tt_move in move_combinations:
+            move_combinations.remove(tt_move)
+            move_combinations.insert(0, tt_move)
+        return move_combinations
+
+    def _order_moves(self, move_combinations, depth, tt_move):
+        """
+        Order: TT move, PV move for this ply, killer moves, then the rest by
+        history score (stable, so the generator's order breaks ties).
+        """
+        history = self.history
+        if history:
+            # Cells are the two halves of the move code (see Board.encode_move)
+            area = self._area
+            move_combinations.sort(key=lambda m: -(history.get(m % area, 0) + history.get(m // area - 1, 0)))
+        front = []
+        if depth < len(self.killers):
+            front.extend(k for k in reversed(self.killers[depth]) if k is not None)
+        if depth < len(self.pv):
+            front.append(self.pv[depth])
+        front.append(tt_move)
+        for move in front:
+            move_combinations = self._order_tt_move(move_combinations, move)
+        return move_combinations
+
+    def _record_cutoff(self, combo, depth, remaining):
+        """Remember a move that caused a beta cutoff as a killer and in history."""
+        if self.stats is not None:
+            self.stats.cutoffs += 1
+        while len(self.killers) <= depth:
+            self.killers.append([None, None])
+        slot = self.killers[depth]
+        if slot[0] != combo:
+            slot[1], slot[0] = slot[0], combo
+        bonus = remaining * remaining
+        second, first = divmod(combo, self._area)
+        for cell in (first, second - 1) if second else (first,):
+            self.history[cell] = self.history.get(cell, 0) + bonus
+
+    def _principal_variation(self, root, best_move, my_player, opp_player):
+        """Follow best moves through the transposition table from the root."""
+        pv = [best_move]
+        if self.tt is None:
+            return pv
+        applied = []
+        player, other = my_player, opp_player
+        while len(pv) < self.max_depth:
+            move = pv[-1]
+            if any(root.grid[r][c] != 0 for r, c in root.decode_move(move)):
+                # A table entry from a hash collision; the line ends here
+                pv.pop()
+                break
+            root.apply_pair(move, player)
+            applied.append(move)
+            if root.last_winner() is not None:
+                break
+            player, other = other, player
+            key = root.hash if player == my_player else root.hash ^ SIDE_KEY
+            entry = self.tt.probe(key)
+            if entry is None or entry[4] is None:
+                break
+            pv.append(entry[4])
+        for move in reversed(applied):
+            root.undo_pair(move)
+        return pv
+
+    def _batch_frontier(self, board_obj, move_combinations, depth, alpha, beta, is_maximizing,
+                        mover, my_player, opp_player, key, remaining, deadline):
+        """
+        Score the children of a frontier node with the batch evaluator, a chunk
+        at a time, keeping alpha-beta cutoffs between chunks. Every child is
+        counted and polled as a node, as if it had been searched.
+        """
+        evaluator = self.batch_evaluator
+        parent = self._timed("evaluation", evaluator.parent, board_obj, my_player, opp_player)
+        alpha_orig, beta_orig = alpha, beta
+        best_move, best_score = None, float('-inf') if is_maximizing else float('inf')
+        decode = board_obj.decode_move
+        moves = iter(move_combinations)
+        while True:
+            chunk = list(islice(moves, evaluator.chunk))
+            if not chunk:
+                break
+            for _ in chunk:
+                self._poll(deadline)
+            scores = self._timed("evaluation", evaluator.children, parent, [decode(m) for m in chunk], mover)
+            pick = max if is_maximizing else min
+            i = pick(range(len(scores)), key=scores.__getitem__)
+            if best_move is None or (scores[i] > best_score if is_maximizing else scores[i] < best_score):
+                best_move, best_score = chunk[i], scores[i]
+            if is_maximizing:
+                alpha = max(alpha, best_score)
+            else:
+                beta = min(beta, best_score)
+            if beta <= alpha:
+                self._record_cutoff(best_move, depth, remaining)
+                break
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER
+            elif best_score >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt.store(key, remaining, flag, best_score, best_move)
+        return best_move, best_score
+
+    def _quiescence(self, board_obj, score, depth, is_maximizing, my_player, opp_player, deadline):
+        """At the horizon, check whether the side to move has a win or an unstoppable double threat."""
+        if not self.quiescence_budget or depth < self.max_depth or math.isinf(score):
+            return score
+        mover, other = (my_player, opp_player) if is_maximizing else (opp_player, my_player)
+        if self.threat_solver.solve(board_obj, mover, other, max_depth=1,
+                                   node_budget=self.quiescence_budget, max_moves=8, deadline=deadline):
+            return float('inf') - depth if mover == my_player else float('-inf') + depth
+        return score
+
     def alphabeta(self, board_obj, depth, alpha, beta, is_maximizing, my_player, opp_player, deadline):
-        if time.time() >= deadline:
-            return [], self.heuristic_func(board_obj.grid, my_player, opp_player,
-                                           win_k=self.win_k, depth=depth)
+        self._poll(deadline)
+        remaining = self.max_depth - depth
+        key = board_obj.hash if is_maximizing else board_obj.hash ^ SIDE_KEY
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(key)
+            if self.stats is not None:
+                self.stats.tt_probes += 1
+                self.stats.tt_hits += entry is not None
+            if entry is not None:
+                _, tt_depth, flag, tt_score, tt_move, _ = entry
+                if depth > 0 and tt_depth >= remaining:
+                    if flag == EXACT:
+                        return tt_move, tt_score
+                    if flag == LOWER:
+                        alpha = max(alpha, tt_score)
+                    elif flag == UPPER:
+                        beta = min(beta, tt_score)
+                    if beta <= alpha:
+                        return tt_move, tt_score
         term = self.evaluate_terminal(board_obj, my_player, opp_player, depth)
         if term is not None:
-            return [], term
-        moves = self.get_moves(board_obj.grid, opp_player)
-        k = min(self.stones_per_move, len(moves))
-        move_combinations = list(combinations(moves, k)) if k > 0 else []
+            term = self._quiescence(board_obj, term, depth, is_maximizing, my_player, opp_player, deadline)
+            if self.tt is not None:
+                self.tt.store(key, remaining, EXACT, term, None)
+            return None, term
+        mover, other = (my_player, opp_player) if is_maximizing else (opp_player, my_player)
+        if self.candidates is None:
+            move_combinations = self._move_stream(board_obj, opp_player, depth, tt_move)
+        else:
+            move_combinations = self._timed("movegen", self._move_combinations, board_obj, mover, other, opp_player)
+            move_combinations = self._timed("ordering", self._order_moves, move_combinations, depth, tt_move)
+        if self.batch_evaluator is not None and depth == self.max_depth - 1:
+            return self._batch_frontier(board_obj, move_combinations, depth, alpha, beta, is_maximizing,
+                                        mover, my_player, opp_player, key, remaining, deadline)
         if is_maximizing:
             best_score = float('-inf')
-            best_move = []
+            best_move = None
             for combo in move_combinations:
-                if time.time() >= deadline: break
-                board_obj.apply_move(combo, my_player)
+                board_obj.apply_pair(combo, my_player)
                 _, score = self.alphabeta(board_obj, depth+1, alpha, beta, False, my_player, opp_player, deadline)
-                board_obj.undo_move(combo)
+                board_obj.undo_pair(combo)
                 if score is not None and score > best_score:
-                    best_score, best_move = score, list(combo)
+                    best_score, best_move = score, combo
                 alpha = max(alpha, best_score)
-                if beta <= alpha: break
-            return best_move, best_score
+                if beta <= alpha:
+                    self._record_cutoff(combo, depth, remaining)
+                    break
         else:
             best_score = float('inf')
-            best_move = []
+            best_move = None
             for combo in move_combinations:
-                if time.time() >= deadline: break
-                board_obj.apply_move(combo, opp_player)
+                board_obj.apply_pair(combo, opp_player)
                 _, score = self.alphabeta(board_obj, depth+1, alpha, beta, True, my_player, opp_player, deadline)
-                board_obj.undo_move(combo)
+                board_obj.undo_pair(combo)
                 if score is not None and score < best_score:
-                    best_score, best_move = score, list(combo)
+                    best_score, best_move = score, combo
                 beta = min(beta, best_score)
-                if beta <= alpha: break
-            return best_move, best_score
+                if beta <= alpha:
+                    self._record_cutoff(combo, depth, remaining)
+                    break
+        if self.tt is not None and best_move is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER
+            elif best_score >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt.store(key, remaining, flag, best_score, best_move)
+        return best_move, best_score
+
+    def _search_board(self, board_obj):
+        """Private copy of the board, with an incremental heuristic attached if it has one."""
+        if self.board_cls is None or type(board_obj) is self.board_cls:
+            root = board_obj.copy()
+        else:
+            root = self.board_cls.from_board(board_obj)
+        set_size = getattr(self.tt, "set_size", None)
+        if set_size is not None:
+            set_size(root.size)
+        self._area = root.area
+        attach = getattr(self.heuristic_func, "attach", None)
+        if attach is not None:
+            attach(root)
+        return root
+
+    def _worker_config(self):
+        """Constructor arguments for the engine each worker process builds."""
+        heuristic_func = self.heuristic_func
+        if getattr(heuristic_func, "table", None) is not None:
+            heuristic_func = copy.copy(heuristic_func)
+            heuristic_func.table = None
+        return dict(max_depth=self.max_depth, heuristic_func=heuristic_func,
+                    stones_per_move=self.stones_per_move, win_k=self.win_k,
+                    near_radius=self.near_radius, iterative_deepening=False,
+                    time_limit_sec=self.time_limit_sec, tt_buckets=self.tt_buckets,
+                    max_candidates=self.max_candidates, workers=1, tt_path=self.tt_path,
+                    threat_budget=0, quiescence_budget=self.quiescence_budget,
+                    board_cls=self.board_cls)
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn keeps workers safe to start from the GUI's AI thread
+            ctx = multiprocessing.get_context("spawn")
+            self._shared_alpha = ctx.Value('d', float('-inf'))
+            self._shared_stop = ctx.Value('b', 0)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx,
+                                             initializer=_init_worker,
+                                             initargs=(self._worker_config(), self._shared_alpha,
+                                                       self._shared_stop))
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool, if one was started, and close a file-backed table."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._shared_alpha = None
+            self._shared_stop = None
+        if hasattr(self.tt, "close"):
+            self.tt.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_shared_alpha'] = None
+        state['_shared_stop'] = None
+        state['_stop_event'] = None
+        state['on_iteration'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop_event = threading.Event()
+
+    def _parallel_root(self, root, my_player, opp_player, deadline):
+        """
+        Root splitting: search the first (best-ordered) move here to get an
+        alpha bound, then hand the rest to the pool in small chunks that share
+        that bound through a multiprocessing.Value.
+        """
+        move_combinations = self._move_combinations(root, my_player, opp_player, opp_player)
+        if self.tt is not None:
+            entry = self.tt.probe(root.hash)
+            if entry is not None:
+                move_combinations = self._order_tt_move(move_combinations, entry[4])
+        if len(move_combinations) <= 1:
+            return self.alphabeta(root, 0, float('-inf'), float('inf'),
+                                  True, my_player, opp_player, deadline)
+
+        first = move_combinations[0]
+        root.apply_pair(first, my_player)
+        _, best_score = self.alphabeta(root, 1, float('-inf'), float('inf'),
+                                       False, my_player, opp_player, deadline)
+        root.undo_pair(first)
+        best_move = first
+
+        pool = self._get_pool()
+        self._shared_alpha.value = best_score
+        self._shared_stop.value = 1 if self._stop_event.is_set() else 0
+        rest = move_combinations[1:]
+        chunk = max(1, math.ceil(len(rest) / (self.workers * 4)))
+        starts = range(0, len(rest), chunk)
+        # Each chunk gets an equal share of what is left of a node limit
+        budget = None
+        if self.node_limit is not None:
+            budget = max(0, self.node_limit - self.nodes) // len(starts)
+        search_board = root.copy()
+        futures = [pool.submit(_search_root_chunk, search_board, rest[i:i + chunk],
+                               self.max_depth, my_player, opp_player, deadline, best_score, self._search_id,
+                               budget)
+                   for i in starts]
+        # Merge in move order so ties keep the better-ordered move
+        completed = True
+        for future in futures:
+            if self._stop_event.is_set():
+                future.cancel()
+                completed = False
+                continue
+            move, score, nodes, done = future.result()
+            self.nodes += nodes
+            completed = completed and done
+            if move is not None and score is not None and score > best_score:
+                best_move, best_score = move, score
+        if not completed or self._out_of_time(deadline):
+            # Some chunks were cut short, so this depth is incomplete
+            raise SearchTimeout()
+        if self.tt is not None:
+            self.tt.store(root.hash, self.max_depth, EXACT, best_score, best_move)
+        return best_move, best_score
+
+    def _search_root(self, root, my_player, opp_player, deadline, alpha=float('-inf'), beta=float('inf')):
+        if self.workers > 1:
+            return self._parallel_root(root, my_player, opp_player, deadline)
+        return self.alphabeta(root, 0, alpha, beta,
+                              True, my_player, opp_player, deadline)
+
+    def _aspiration_search(self, root, my_player, opp_player, deadline, guess):
+        """
+        Search with a narrow window around the previous iteration's score and
+        fall back to the full window if the result lands outside it.
+        """
+        window = self.aspiration_window
+        if self.batch_evaluator is not None:
+            window = getattr(self.batch_evaluator, "aspiration_window", window)
+        if not window or guess is None or math.isinf(guess) or self.workers > 1:
+            return self._search_root(root, my_player, opp_player, deadline)
+        alpha, beta = guess - window, guess + window
+        move, score = self._search_root(root, my_player, opp_player, deadline, alpha, beta)
+        if score is None or score <= alpha or score >= beta:
+            move, score = self._search_root(root, my_player, opp_player, deadline)
+        return move, score
+
+    def _fallback_move(self, board_obj, my_player, opp_player):
+        """Best-ordered move, for when the budget runs out before depth 1 is searched."""
+        combos = self._move_combinations(board_obj, my_player, opp_player, opp_player)
+        return (combos[0], None) if combos else (None, None)
+
+    def _next_depth_fits(self, iterations, deadline):
+        """Whether the next depth is predicted to finish within the node or time budget."""
+        cost = next_iteration_cost(iterations)
+        if cost is None:
+            return True
+        if self.node_limit is not None:
+            return self.nodes + cost[0] <= self.node_limit
+        return time.monotonic() + cost[1] <= deadline
 
     def choose_move(self, board_obj, my_player, opp_player):
-        deadline = time.time() + max(0.2, float(self.time_limit_sec))
-        best_move, best_score = [], None
+        self.stats = SearchStats() if self.collect_stats else None
+        move, score = self._choose_move(board_obj, my_player, opp_player)
+        if self.stats is not None:
+            self.stats.finish(self.nodes)
+        # Moves are int codes inside the search and (r, c) stones outside it
+        return (list(board_obj.decode_move(move)) if move is not None else []), score
+
+    def _choose_move(self, board_obj, my_player, opp_player):
+        start = time.monotonic()
+        # A node limit replaces the clock so that runs repeat exactly
+        if self.node_limit is not None:
+            deadline = float('inf')
+        else:
+            deadline = start + max(0.2, float(self.time_limit_sec))
+        self.nodes = 0
+        self.depth_log = []
+        best_move, best_score = None, None
+        self._search_id += 1
+        if self.tt is not None:
+            self.tt.new_search()
+        self.pv = []
+        self.killers = []
+        # Age history so the last move's cutoffs still count, but less
+        self.history = {cell: v // 2 for cell, v in self.history.items() if v > 1}
+        if self.threat_budget:
+            # A forced win found by threat-space search needs no full-width search;
+            # it gets at most half the move's time so the search still has the rest
+            win = self.threat_solver.solve(board_obj.copy(), my_player, opp_player,
+                                           node_budget=self.threat_budget,
+                                           deadline=start + (deadline - start) / 2,
+                                           stopped=self._stopped)
+            if self.stats is not None:
+                self.stats.threat_nodes = self.threat_solver.nodes
+            if win:
+                win = board_obj.encode_move(win)
+                self.pv = [win]
+                return win, float('inf')
+        root = self._search_board(board_obj)
         if not self.iterative_deepening:
-            return self.alphabeta(board_obj.copy(), 0, float('-inf'), float('inf'),
-                                  True, my_player, opp_player, deadline)
+            try:
+                return self._search_root(root, my_player, opp_player, deadline)
+            except SearchTimeout:
+                return self._fallback_move(board_obj, my_player, opp_player)
         original_max = self.max_depth
-        for d in range(1, original_max+1):
-            if time.time() >= deadline: break
-            self.max_depth = d
-            move, score = self.alphabeta(board_obj.copy(), 0, float('-inf'), float('inf'),
-                                         True, my_player, opp_player, deadline)
-            if move: best_move, best_score = move, score
-        self.max_depth = original_max
-        return best_move, best_score
\ No newline at end of file
+        iterations = []  # (nodes, seconds) of each completed depth
+        try:
+            for d in range(1, original_max+1):
+                if self._out_of_time(deadline) or not self._next_depth_fits(iterations, deadline):
+                    break
+                self.max_depth = d
+                iter_start, iter_nodes = time.monotonic(), self.nodes
+                try:
+                    move, score = self._aspiration_search(root, my_player, opp_player, deadline, best_score)
+                except SearchTimeout:
+                    # An unfinished depth is thrown away; the last completed one stands
+                    if self.stats is not None:
+                        self.stats.end_iteration(d, self.nodes, False)
+                    break
+                if move is not None:
+                    best_move, best_score = move, score
+                    self.pv = self._principal_variation(root, best_move, my_player, opp_player)
+                now = time.monotonic()
+                iterations.append((self.nodes - iter_nodes, now - iter_start))
+                self.depth_log.append((d, self.nodes, now - start))
+                if self.on_iteration is not None and best_move is not None:
+                    self.on_iteration(d, best_score, self.nodes, now - start, list(board_obj.decode_move(best_move)))
+                if self.stats is not None:
+                    self.stats.end_iteration(d, self.nodes, True)
+        finally:
+            self.max_depth = original_max
+        if best_move is None:
+            return self._fallback_move(board_obj, my_player, opp_player)
+        return best_move, best_score
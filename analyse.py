@@ -0,0 +1,183 @@
+# analyse.py
+"""
+Batch analysis of recorded games (see gamerecord.py).
+
+    python analyse.py games.c6g --out analysis.jsonl --player AlphaBeta,depth=3,time=1
+
+Every game is replayed on a Board and the engine searches each position
+before the move that was played. Games are spread over a process pool and
+read from the record file as workers free up, so the corpus is never held
+in memory; results are written in game order as they finish, one JSON line
+per move:
+
+    {"game": 0, "move": 3, "player": 1, "played": [[9, 9], [9, 10]],
+     "best": [[9, 8], [9, 11]], "score": 41, "played_value": 12,
+     "best_value": 40, "loss": 28, "blunder": false}
+
+score is the engine's score for the position from the mover's side.
+played_value and best_value score the positions after the played move and
+after the engine's move the same way (the opponent's search, negated; a
+win, or 0 for a draw, when the move ends the game), so both are searched
+to the same depth and loss is the difference between them. A move losing
+at least --blunder is flagged. A search that ends without a score (out of
+budget before depth 1, or no move) leaves its value and the loss null and
+flags nothing. Scores are "win" or "loss" once a forced
+result is found, and loss is "decisive" when the move gives up a forced
+win or walks into a forced loss. A record that cannot be replayed gets
+one line with an "error" instead.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from gamerecord import read_records
+from tournament import parse_player, make_engine
+
+DEFAULT_PLAYER = "AlphaBeta,depth=3,time=1"
+
+_engines = {}  # per worker process: (player spec, win_k) -> engine, kept warm between games
+
+
+def _engine(spec, win_k):
+    key = (spec, win_k)
+    if key not in _engines:
+        _engines[key] = make_engine(parse_player(spec), win_k)
+    return _engines[key]
+
+
+def _search(engine, board, player, first_move):
+    move, score = engine.choose_move(board, player, 3 - player)
+    if first_move:
+        move = move[:1]  # the first move of the game is a single stone
+    return move, score
+
+
+def _value_after(engine, board, stones, player):
+    """
+    Score for player of the position after playing stones, from the
+    opponent's search; None when that search ends without a score.
+    """
+    board.apply_move(stones, player)
+    try:
+        if board.check_win_at(stones, player):
+            return math.inf
+        if board.check_draw():
+            return 0
+        score = engine.choose_move(board, 3 - player, player)[1]
+        return None if score is None else -score
+    finally:
+        board.undo_move(stones)
+
+
+def _json_score(score):
+    if score is None or math.isfinite(score):
+        return score
+    return "win" if score > 0 else "loss"
+
+
+def analyse_game(index, record, spec, blunder):
+    """Analysis lines (dicts) for one game; runs in a worker process."""
+    engine = _engine(spec, record.win_k)
+    plies = []  # [stones, player, best, score, best_value, played_value]
+    try:
+        for board, stones, player in record.positions():
+            best, score = _search(engine, board, player, not board.history)
+            same = sorted(best) == sorted(stones)
+            best_value = _value_after(engine, board, best, player) if best and not same else None
+            # Unless the move ends the game, the next position's search scores it
+            board.apply_move(stones, player)
+            if board.check_win_at(stones, player):
+                played_value = math.inf
+            elif board.check_draw():
+                played_value = 0
+            else:
+                played_value = None
+            board.undo_move(stones)
+            plies.append([stones, player, best, score, best_value, played_value])
+    except ValueError as e:
+        return [{"game": index, "tag": record.tag, "error": str(e)}]
+    for ply, following in zip(plies, plies[1:]):
+        if ply[5] is None and following[3] is not None:
+            ply[5] = -following[3]
+
+    lines = []
+    for i, (stones, player, best, score, best_value, played_value) in enumerate(plies):
+        if best and sorted(best) == sorted(stones):
+            best_value = played_value
+        loss = None
+        if best_value is not None and played_value is not None:
+            loss = best_value - played_value if best_value != played_value else 0
+        lines.append({
+            "game": index,
+            "move": i + 1,
+            "player": player,
+            "played": [list(cell) for cell in stones],
+            "best": [list(cell) for cell in best],
+            "score": _json_score(score),
+            "played_value": _json_score(played_value),
+            "best_value": _json_score(best_value),
+            "loss": loss if loss is None or math.isfinite(loss) else "decisive",
+            "blunder": loss is not None and loss >= blunder,
+        })
+    return lines
+
+
+def run(path, out, spec=DEFAULT_PLAYER, workers=None, blunder=500, limit=None, progress=sys.stderr):
+    """Analyse every game in path and write JSON lines to out; returns (games, moves, blunders)."""
+    ctx = multiprocessing.get_context("spawn")
+    games = moves = blunders = 0
+    window = 2 * (workers or os.cpu_count() or 1)  # games submitted but not yet written
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        pending = deque()
+
+        def drain(keep):
+            nonlocal games, moves, blunders
+            while len(pending) > keep:
+                for line in pending.popleft().result():
+                    out.write(json.dumps(line) + "\n")
+                    moves += "move" in line
+                    blunders += line.get("blunder", False)
+                out.flush()
+                games += 1
+                print(f"game {games} analysed", file=progress)
+
+        for index, record in enumerate(read_records(path)):
+            if limit is not None and index >= limit:
+                break
+            pending.append(pool.submit(analyse_game, index, record, spec, blunder))
+            drain(window)
+        drain(0)
+    return games, moves, blunders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse recorded games with a search engine.")
+    parser.add_argument("games", help="game record file (gamerecord.py format)")
+    parser.add_argument("--out", help="write JSON lines here (default: stdout)")
+    parser.add_argument("--player", default=DEFAULT_PLAYER, help="engine spec as in tournament.py")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--blunder", type=float, default=500, help="loss that flags a move as a blunder")
+    parser.add_argument("--limit", type=int, default=None, help="only the first LIMIT games")
+    args = parser.parse_args(argv)
+    try:
+        make_engine(parse_player(args.player))  # a bad spec fails here, not in every worker
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        games, moves, blunders = run(args.games, out, args.player, args.workers, args.blunder, args.limit)
+    finally:
+        if args.out:
+            out.close()
+    print(f"{games} games, {moves} moves, {blunders} blunders", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
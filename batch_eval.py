@@ -0,0 +1,158 @@
+# batch_eval.py
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for BatchEvaluator
+    np = None
+
+DIRS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+_LAYOUTS = {}
+
+
+def window_sums(stones, dr, dc, win_k):
+    """
+    Sum of stones over every length-win_k window in direction (dr, dc) for an
+    (N, N) int8 board. This is a 1-D line convolution, written as win_k
+    shifted slice additions so it stays in NumPy.
+    Returns an int16 array of window counts indexed by window start.
+    """
+    N = stones.shape[0]
+    span = N - win_k + 1
+    total = None
+    for i in range(win_k):
+        if (dr, dc) == (0, 1):
+            part = stones[:, i:i + span]
+        elif (dr, dc) == (1, 0):
+            part = stones[i:i + span, :]
+        elif (dr, dc) == (1, 1):
+            part = stones[i:i + span, i:i + span]
+        else:  # (1, -1): window (r, j) covers (r + i, j + win_k - 1 - i)
+            part = stones[i:i + span, win_k - 1 - i:N - i]
+        total = part.astype(np.int16) if total is None else total + part
+    return total
+
+
+def window_layout(size, win_k):
+    """
+    Flat window numbering that matches window_sums' output order (direction
+    by direction, row-major), and an (N*N, 4*win_k) table of the windows
+    through each cell, padded with the sentinel index n_windows.
+    """
+    key = (size, win_k)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        N, k = size, win_k
+        span = N - k + 1
+        shapes = [(N, span), (span, N), (span, span), (span, span)]
+        offsets = [0]
+        for rows, cols in shapes:
+            offsets.append(offsets[-1] + rows * cols)
+        n_windows = offsets[-1]
+        table = np.full((N * N, 4 * k), n_windows, dtype=np.intp)
+        for r in range(N):
+            for c in range(N):
+                found = []
+                for i in range(k):
+                    if 0 <= c - i < span:
+                        found.append(offsets[0] + r * span + (c - i))
+                    if 0 <= r - i < span:
+                        found.append(offsets[1] + (r - i) * N + c)
+                    if 0 <= r - i < span and 0 <= c - i < span:
+                        found.append(offsets[2] + (r - i) * span + (c - i))
+                    j = c - (k - 1) + i
+                    if 0 <= r - i < span and 0 <= j < span:
+                        found.append(offsets[3] + (r - i) * span + j)
+                table[r * N + c, :len(found)] = found
+        layout = (n_windows, table)
+        _LAYOUTS[key] = layout
+    return layout
+
+
+class BatchEvaluator:
+    """
+    Scores every child of a position in one vectorized pass.
+
+    The parent's int8 board is convolved along the four directions once to get
+    each player's stone count in every length-win_k window. A child differs
+    from the parent only in the windows through its new stones, so all
+    children are scored together by gathering those windows for the whole
+    batch, recounting them with the new stones and summing the difference.
+
+    Each live window (no opposing stone) is worth weights[n] for the n stones
+    in it, mine minus the opponent's; a completed line scores +/-inf.
+
+    Search callers score children `chunk` at a time through parent()/children()
+    so an alpha-beta cutoff in an early chunk skips the rest.
+    """
+
+    def __init__(self, win_k=6, weights=None, chunk=64):
+        if np is None:
+            raise ImportError("BatchEvaluator needs numpy (pip install numpy)")
+        self.win_k = win_k
+        if weights is None:
+            weights = [0] + [4 ** n for n in range(1, win_k)] + [0]
+        self.weights = np.array(weights, dtype=np.float64)
+        # One more stone in a live four-stone window; AlphaBeta uses this as its
+        # aspiration window in place of one sized for heuristic_func
+        self.aspiration_window = float(self.weights[win_k - 2])
+        self.chunk = chunk  # children per vectorized call, so cutoffs can stop early
+
+    def window_counts(self, board_obj, my_player, opp_player):
+        """Per-window stone counts (mine, theirs), with a zero sentinel appended."""
+        grid = np.array(board_obj.grid, dtype=np.int8)
+        counts = []
+        for player in (my_player, opp_player):
+            stones = (grid == player).astype(np.int8)
+            parts = [window_sums(stones, dr, dc, self.win_k).ravel() for dr, dc in DIRS]
+            parts.append(np.zeros(1, dtype=np.int16))
+            counts.append(np.concatenate(parts))
+        return counts
+
+    def _contrib(self, mine, theirs):
+        w = self.weights
+        return w[mine] * (theirs == 0) - w[theirs] * (mine == 0)
+
+    def parent(self, board_obj, my_player, opp_player):
+        """Window state of the parent position, reused for every batch of its children."""
+        N = board_obj.size
+        n_windows, table = window_layout(N, self.win_k)
+        mine, theirs = self.window_counts(board_obj, my_player, opp_player)
+        base = float(self._contrib(mine[:n_windows], theirs[:n_windows]).sum())
+        return (N, n_windows, table, mine, theirs, base, my_player)
+
+    def children(self, parent, combos, mover):
+        """Scores (from my_player's side) of the children reached by mover playing each combo."""
+        N, n_windows, table, mine, theirs, base, my_player = parent
+        k = self.win_k
+        cells = np.array([[r * N + c for r, c in combo] for combo in combos], dtype=np.intp)
+        ids = np.sort(table[cells].reshape(len(combos), -1), axis=1)
+        # A window holding several of the new stones appears once per stone
+        first = np.ones(ids.shape, dtype=bool)
+        first[:, 1:] = ids[:, 1:] != ids[:, :-1]
+        added = np.ones(ids.shape, dtype=np.int16)
+        for step in range(1, cells.shape[1]):
+            same = np.zeros(ids.shape, dtype=bool)
+            same[:, :-step] = ids[:, step:] == ids[:, :-step]
+            added += same
+        keep = first & (ids != n_windows)
+
+        m_old, t_old = mine[ids], theirs[ids]
+        if mover == my_player:
+            m_new, t_new = m_old + added, t_old
+        else:
+            m_new, t_new = m_old, t_old + added
+        delta = (self._contrib(m_new, t_new) - self._contrib(m_old, t_old)) * keep
+        score = base + delta.sum(axis=1)
+
+        won = (((m_new == k) | (t_new == k)) & keep).any(axis=1)
+        score = np.where(won, np.inf if mover == my_player else -np.inf, score)
+        return score.tolist()
+
+    def evaluate(self, board_obj, combos, mover, my_player, opp_player):
+        """Score all children of board_obj in one pass."""
+        if not combos:
+            return []
+        if board_obj.size < self.win_k:
+            return [0.0] * len(combos)
+        return self.children(self.parent(board_obj, my_player, opp_player), combos, mover)
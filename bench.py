@@ -0,0 +1,210 @@
+# bench.py
+"""
+Headless benchmark: runs each engine/heuristic pair on a fixed corpus of
+positions and reports nodes, nodes/sec, time to each depth, effective
+branching factor and the chosen move.
+
+    python bench.py --out before.json
+    python bench.py --compare before.json
+
+Results are written as JSON (to --out, or stdout) so runs from two commits
+can be compared with --compare; a readable table goes to stderr.
+"""
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+
+from board import Board
+from sparse_board import SparseBoard
+from bitboard import BitBoard
+from batch_eval import BatchEvaluator
+from alphabeta import AlphaBeta
+from minimax import Minimax
+from heuristics import heuristic1, heuristic2
+
+# name -> (board size, player to move, black stones, white stones)
+POSITIONS = {
+    "opening-19": (19, 1, "9,9", "9,10 10,10"),
+    "midgame-19": (19, 2, "5,5 5,10 5,13 6,13 7,6 10,6 11,5 11,6 13,13",
+                   "5,6 6,11 7,8 7,10 11,11 12,13 13,6 13,12"),
+    "tactical-19": (19, 2, "5,7 7,6 7,12 9,13 11,12 12,9 12,12 13,9 13,13",
+                    "5,9 5,12 6,7 8,8 9,5 9,9 10,10 13,11"),
+    "opening-13": (13, 1, "6,6", "6,7 7,7"),
+    "midgame-13": (13, 2, "3,10 4,3 5,3 6,3 7,9 9,8 9,9 9,10 10,8",
+                   "2,7 5,4 6,5 6,10 7,3 7,8 8,3 10,5"),
+    "tactical-13": (13, 2, "2,4 4,3 4,9 6,10 8,9 9,6 9,9 10,6 10,10",
+                    "2,6 2,9 3,4 5,5 6,2 6,6 7,7 10,8"),
+    "nearfull-8": (8, 2, "0,1 0,2 0,5 1,2 1,3 1,6 1,7 2,5 2,6 3,0 3,6 3,7 4,1 4,6 4,7 "
+                         "5,2 5,3 5,4 5,6 6,0 6,2 6,3 7,0 7,1 7,5",
+                   "0,0 0,7 1,0 1,4 2,0 2,1 2,2 2,3 2,4 3,2 3,3 3,4 3,5 4,3 4,4 "
+                   "5,0 5,5 5,7 6,1 6,5 6,6 6,7 7,3 7,6"),
+    "midgame-59": (59, 2, "25,25 25,30 25,33 26,33 27,26 30,26 31,25 31,26 33,33",
+                   "25,26 26,31 27,28 27,30 31,31 32,33 33,26 33,32"),
+}
+
+ENGINES = {"Minimax": Minimax, "AlphaBeta": AlphaBeta}
+HEURISTICS = {"heuristic1": heuristic1, "heuristic2": heuristic2}
+
+
+def load_position(name, board_cls=Board):
+    """(board, player to move) for a corpus position."""
+    size, to_move, black, white = POSITIONS[name]
+    board = board_cls(size)
+    for player, stones in ((1, black), (2, white)):
+        for cell in stones.split():
+            r, c = cell.split(",")
+            board.apply_move([(int(r), int(c))], player)
+    return board, to_move
+
+
+def branching_factor(depth_log):
+    """Effective branching factor: node growth between the last two completed depths."""
+    if len(depth_log) >= 2 and depth_log[-2][1]:
+        return depth_log[-1][1] / depth_log[-2][1]
+    if depth_log and depth_log[-1][0] > 0:
+        depth, nodes, _ = depth_log[-1]
+        return nodes ** (1.0 / depth)
+    return None
+
+
+def _json_score(score):
+    if score is None or not math.isinf(score):
+        return score
+    return "+inf" if score > 0 else "-inf"
+
+
+def run_case(engine_name, heuristic_name, position, depth, time_limit, max_candidates, threats=False,
+             sparse=False, bitboard=False, batch=False, quiescence=0):
+    board, to_move = load_position(position, SparseBoard if sparse else Board)
+    extra = {}
+    if engine_name == "AlphaBeta":
+        # Keep the comparison to plain search unless asked otherwise
+        extra = dict(quiescence_budget=quiescence)
+        if not threats:
+            extra["threat_budget"] = 0
+    if bitboard:
+        extra["board_cls"] = BitBoard
+    if batch and engine_name == "AlphaBeta":
+        extra["batch_evaluator"] = BatchEvaluator(board.win_k)
+    engine = ENGINES[engine_name](max_depth=depth,
+                                  heuristic_func=HEURISTICS[heuristic_name],
+                                  win_k=board.win_k,
+                                  time_limit_sec=time_limit,
+                                  max_candidates=max_candidates,
+                                  **extra)
+    start = time.perf_counter()
+    move, score = engine.choose_move(board, to_move, 3 - to_move)
+    seconds = time.perf_counter() - start
+    if hasattr(engine, "close"):
+        engine.close()
+    log = engine.depth_log
+    ebf = branching_factor(log)
+    return {
+        "position": position,
+        "engine": engine_name,
+        "heuristic": heuristic_name,
+        "max_depth": depth,
+        "completed_depth": log[-1][0] if log else 0,
+        "best_move": [list(cell) for cell in move],
+        "score": _json_score(score),
+        "nodes": engine.nodes,
+        "seconds": round(seconds, 4),
+        "nodes_per_sec": round(engine.nodes / seconds, 1) if seconds > 0 else None,
+        "time_to_depth": {str(d): round(t, 4) for d, _, t in log},
+        "branching_factor": round(ebf, 2) if ebf else None,
+    }
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _case_key(case):
+    return (case["position"], case["engine"], case["heuristic"], case["max_depth"])
+
+
+def print_table(cases, out=sys.stderr):
+    header = f"{'position':<13} {'engine':<10} {'heuristic':<11} {'depth':>5} {'nodes':>9} {'sec':>8} {'nps':>9} {'ebf':>6}  move"
+    print(header, file=out)
+    for c in cases:
+        print(f"{c['position']:<13} {c['engine']:<10} {c['heuristic']:<11} "
+              f"{c['completed_depth']:>2}/{c['max_depth']:<2} {c['nodes']:>9} {c['seconds']:>8.3f} "
+              f"{c['nodes_per_sec'] or 0:>9.0f} {c['branching_factor'] or 0:>6.2f}  {c['best_move']}",
+              file=out)
+
+
+def print_comparison(baseline, cases, out=sys.stderr):
+    """Per case: time and nodes/sec against the baseline run (ratios > 1 mean slower / faster)."""
+    before = {_case_key(c): c for c in baseline["cases"]}
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:", file=out)
+    print(f"{'position':<13} {'engine':<10} {'heuristic':<11} {'time x':>8} {'nps x':>8}  move", file=out)
+    for c in cases:
+        old = before.get(_case_key(c))
+        if old is None:
+            continue
+        time_ratio = c["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        nps_ratio = (c["nodes_per_sec"] or 0) / old["nodes_per_sec"] if old["nodes_per_sec"] else float("nan")
+        same = "same" if c["best_move"] == old["best_move"] else f"{old['best_move']} -> {c['best_move']}"
+        print(f"{c['position']:<13} {c['engine']:<10} {c['heuristic']:<11} "
+              f"{time_ratio:>8.2f} {nps_ratio:>8.2f}  {same}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search engines on a fixed position corpus.")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--heuristics", nargs="+", default=list(HEURISTICS), choices=list(HEURISTICS))
+    parser.add_argument("--positions", nargs="+", default=list(POSITIONS), choices=list(POSITIONS))
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--time", type=float, default=60.0, help="time limit per search, seconds")
+    parser.add_argument("--candidates", type=int, default=12, help="top-K candidate cells (0 = every pair)")
+    parser.add_argument("--threats", action="store_true",
+                        help="let AlphaBeta run its threat-space solver before the search")
+    parser.add_argument("--quiescence", type=int, default=0,
+                        help="node budget of AlphaBeta's threat check at every leaf (0 = off)")
+    parser.add_argument("--sparse", action="store_true", help="play the positions on a SparseBoard")
+    parser.add_argument("--bitboard", action="store_true", help="have the engines search on a BitBoard")
+    parser.add_argument("--batch", action="store_true",
+                        help="score AlphaBeta's last ply with the NumPy BatchEvaluator (needs numpy)")
+    parser.add_argument("--out", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    cases = []
+    for position in args.positions:
+        for engine_name in args.engines:
+            for heuristic_name in args.heuristics:
+                cases.append(run_case(engine_name, heuristic_name, position, args.depth,
+                                      args.time, args.candidates or None, args.threats, args.sparse,
+                                      args.bitboard, args.batch, args.quiescence))
+    result = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"depth": args.depth, "time": args.time, "candidates": args.candidates,
+                     "threats": args.threats, "quiescence": args.quiescence, "sparse": args.sparse,
+                     "bitboard": args.bitboard, "batch": args.batch},
+        "cases": cases,
+    }
+    print_table(cases)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), cases)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
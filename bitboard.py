@@ -0,0 +1,191 @@
+# bitboard.py
+
+from board import Board, zobrist_keys, cell_coords
+
+_BIT_CELLS = {}
+
+
+def _bit_cells(size):
+    """(r, c) for every bit index of a size x size bitboard, shared by every board of one size."""
+    cells = _BIT_CELLS.get(size)
+    if cells is None:
+        cells = [divmod(i, size + 1) for i in range(size * (size + 1))]
+        _BIT_CELLS[size] = cells
+    return cells
+
+
+class BitBoard(Board):
+    """
+    Board backend that mirrors `grid` into one big-integer bitboard per player.
+
+    Cells are laid out row by row with a stride of size + 1, so every row ends
+    in an always-empty padding bit. That padding stops runs from wrapping
+    around the board edge, which means each of the four line directions is a
+    plain right shift of the same integer:
+
+        (0, 1) -> 1    (1, 0) -> stride    (1, 1) -> stride + 1    (1, -1) -> stride - 1
+
+    `grid` is still kept up to date, so code that reads it keeps working.
+    There is no per-cell near count: candidate_cells (and frontier) are read
+    off near_mask, and check_win_at from the runs of the mover's bitboard.
+    """
+
+    def __init__(self, size=19, win_k=6, near_radius=2):
+        self.size = size
+        self.win_k = win_k
+        self.near_radius = near_radius
+        self.grid = [[Board.EMPTY for _ in range(size)] for _ in range(size)]
+        self.stone_count = 0
+        self.history = []
+        self.zobrist = zobrist_keys(size)
+        self.area = size * size
+        self.coords = cell_coords(size)
+        self.hash = 0
+        self.listeners = []
+        self.stride = size + 1
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        row_mask = (1 << size) - 1
+        self.full_mask = 0
+        for r in range(size):
+            self.full_mask |= row_mask << (r * self.stride)
+        self.bits = {1: 0, 2: 0}
+        self._bit_cells = _bit_cells(size)
+
+    def bit(self, r, c):
+        """Bit for cell (r, c)."""
+        return 1 << (r * self.stride + c)
+
+    def cell(self, index):
+        """Cell (r, c) for a bit index."""
+        return divmod(index, self.stride)
+
+    def _place(self, r, c, player):
+        self.grid[r][c] = player
+        self.stone_count += 1
+        self.hash ^= self.zobrist[player][r * self.size + c]
+        self.bits[player] |= 1 << (r * self.stride + c)
+        for listener in self.listeners:
+            listener.on_place(r, c, player)
+
+    def _remove(self, r, c):
+        player = self.grid[r][c]
+        self.grid[r][c] = Board.EMPTY
+        self.stone_count -= 1
+        self.hash ^= self.zobrist[player][r * self.size + c]
+        self.bits[player] &= ~(1 << (r * self.stride + c))
+        for listener in self.listeners:
+            listener.on_remove(r, c, player)
+
+    @property
+    def frontier(self):
+        """Empty cells within near_radius of a stone, as Board keeps them."""
+        return set(self.cells(self.near_mask(self.near_radius)))
+
+    def candidate_cells(self):
+        """Empty cells within near_radius of a stone in row-major order, or every cell on an empty board."""
+        if self.stone_count == 0:
+            return [(r, c) for r in range(self.size) for c in range(self.size)]
+        return self.cells(self.near_mask(self.near_radius))
+
+    def occupied(self):
+        """Bitboard of all stones."""
+        return self.bits[1] | self.bits[2]
+
+    def empty(self):
+        """Bitboard of all empty cells."""
+        return self.full_mask & ~self.occupied()
+
+    @staticmethod
+    def runs(bits, shift, length):
+        """
+        Bits that start a run of `length` set bits along `shift`.
+        Uses doubling, so a run of 6 costs three shift/AND steps.
+        """
+        have = 1
+        while have < length and bits:
+            step = min(have, length - have)
+            bits &= bits >> (step * shift)
+            have += step
+        return bits
+
+    def check_win(self, player):
+        """Check if the given player has a winning line of length win_k."""
+        bits = self.bits.get(player, 0)
+        for shift in self.shifts:
+            if BitBoard.runs(bits, shift, self.win_k):
+                return True
+        return False
+
+    def check_win_at(self, move_combo, player):
+        """Check for a winning line through the given stones: runs of win_k that cover one of them."""
+        bits = self.bits.get(player, 0)
+        placed = 0
+        for r, c in Board.normalize_move(move_combo):
+            placed |= 1 << (r * self.stride + c)
+        placed &= bits
+        if not placed:
+            return False
+        k = self.win_k
+        for shift in self.shifts:
+            covered = BitBoard.runs(bits, shift, k)
+            # Spread each run start over the win_k cells of its run
+            have = 1
+            while have < k and covered:
+                step = min(have, k - have)
+                covered |= covered << (step * shift)
+                have += step
+            if covered & placed:
+                return True
+        return False
+
+    def check_draw(self):
+        """Check if the board is full (draw)."""
+        return self.occupied() == self.full_mask
+
+    def longest_run(self, player):
+        """Length of the longest line of stones the player has in any direction."""
+        bits = self.bits.get(player, 0)
+        best = 0
+        for shift in self.shifts:
+            run, length = bits, 0
+            while run:
+                length += 1
+                run &= run >> shift
+            best = max(best, length)
+        return best
+
+    def near_mask(self, radius=2):
+        """Bitboard of empty cells within `radius` (Chebyshev) of any stone."""
+        near = self.occupied()
+        for _ in range(radius):
+            grown = near | (near << 1) | (near >> 1)
+            near = grown | (grown << self.stride) | (grown >> self.stride)
+            near &= self.full_mask
+        return near & ~self.occupied()
+
+    def cells(self, bits):
+        """List the (r, c) cells of a bitboard, lowest bit (row-major) first."""
+        # Reading the binary string is far cheaper than peeling bits off one by one
+        cell = self._bit_cells
+        return [cell[i] for i, ch in enumerate(bin(bits)[:1:-1]) if ch == "1"]
+
+    def reset(self):
+        """Reset the board to empty state."""
+        if self.listeners:
+            for r, c, _ in self.stones():
+                self._remove(r, c)
+        self.grid = [[Board.EMPTY for _ in range(self.size)] for _ in range(self.size)]
+        self.stone_count = 0
+        self.history = []
+        self.hash = 0
+        self.bits = {1: 0, 2: 0}
+
+    def copy(self):
+        """Return a deep copy of the board for search algorithms."""
+        new_board = type(self)(size=self.size, win_k=self.win_k, near_radius=self.near_radius)
+        new_board.grid = [row[:] for row in self.grid]
+        new_board.stone_count = self.stone_count
+        new_board.hash = self.hash
+        new_board.bits = dict(self.bits)
+        new_board.history = [(list(stones), player) for stones, player in self.history]
+        return new_board
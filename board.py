@@ -1,53 +1,227 @@
 # board.py
 
+import random
+
+_ZOBRIST = {}
+_COORDS = {}
+_NEAR = {}
+
+
+def zobrist_keys(size):
+    """
+    Random 64-bit keys per player and cell, shared by every board of one size.
+    Seeded by size so hashes agree across processes.
+    """
+    keys = _ZOBRIST.get(size)
+    if keys is None:
+        rng = random.Random(size)
+        keys = {p: [rng.getrandbits(64) for _ in range(size * size)] for p in (1, 2)}
+        _ZOBRIST[size] = keys
+    return keys
+
+
+def cell_coords(size):
+    """(r, c) tuple for every cell index r * size + c, shared by every board of one size."""
+    coords = _COORDS.get(size)
+    if coords is None:
+        coords = [(r, c) for r in range(size) for c in range(size)]
+        _COORDS[size] = coords
+    return coords
+
+
+def near_table(size, radius):
+    """For every cell index, the indices of the cells within radius of it (itself included)."""
+    table = _NEAR.get((size, radius))
+    if table is None:
+        table = []
+        for r in range(size):
+            for c in range(size):
+                r0, r1 = max(0, r - radius), min(size - 1, r + radius)
+                c0, c1 = max(0, c - radius), min(size - 1, c + radius)
+                table.append([nr * size + nc for nr in range(r0, r1 + 1) for nc in range(c0, c1 + 1)])
+        _NEAR[(size, radius)] = table
+    return table
+
+
+def stones_of(grid, player):
+    """
+    (r, c) of every stone of player in grid, in row-major order. A
+    SparseBoard grid lists its stones directly instead of being scanned.
+    """
+    stones = getattr(grid, "stones", None)
+    if stones is not None:
+        return sorted(cell for cell, v in stones.items() if v == player)
+    return [(r, c) for r, row in enumerate(grid) for c, v in enumerate(row) if v == player]
+
+
 class Board:
     EMPTY = 0
 
-    def __init__(self, size=19, win_k=6):
+    def __init__(self, size=19, win_k=6, near_radius=2):
         self.size = size
         self.win_k = win_k
+        self.near_radius = near_radius
         self.grid = [[Board.EMPTY for _ in range(size)] for _ in range(size)]
+        self.stone_count = 0
+        self.history = []  # stack of (stones, player) for each applied move
+        self.zobrist = zobrist_keys(size)
+        self.area = size * size
+        self.coords = cell_coords(size)
+        self.near = near_table(size, near_radius)
+        self.hash = 0
+        self.listeners = []  # objects with on_place/on_remove, kept in sync with grid
+        # Stones within near_radius of each cell; frontier holds the empty cells with a count
+        self.near_counts = [0] * (size * size)
+        self.frontier = set()
 
     def inside(self, r, c):
         """Check if coordinates are inside the board."""
         return 0 <= r < self.size and 0 <= c < self.size
 
-    def apply_move(self, move_combo, player):
+    @staticmethod
+    def normalize_move(move_combo):
         """
-        Apply a move (one or two stones).
         Normalize move_combo into a list of (r, c) tuples.
+        Accepts a single (r, c), a list/tuple of (r, c), or a nested [((r, c))].
         """
         # If it's a single tuple like (r, c), wrap it
         if isinstance(move_combo, tuple) and isinstance(move_combo[0], int):
-            move_combo = [move_combo]
+            return [move_combo]
 
         # If it's a list but contains a nested tuple, flatten it
         if isinstance(move_combo, list) and len(move_combo) == 1 and isinstance(move_combo[0], tuple):
             inner = move_combo[0]
             if isinstance(inner[0], tuple):  # e.g. [((r, c))]
-                move_combo = [inner[0]]
+                return [inner[0]]
 
+        return move_combo
+
+    def apply_move(self, move_combo, player):
+        """Apply a move (one or two stones)."""
+        move_combo = Board.normalize_move(move_combo)
         for (r, c) in move_combo:
             if not self.inside(r, c) or self.grid[r][c] != Board.EMPTY:
                 raise ValueError(f"Invalid move at ({r}, {c})")
-            self.grid[r][c] = player
+        if len(set(move_combo)) != len(move_combo):
+            raise ValueError(f"Duplicate stones in move {move_combo}")
+        for (r, c) in move_combo:
+            self._place(r, c, player)
+        self.history.append((list(move_combo), player))
 
     def undo_move(self, move_combo):
+        """Undo a move (remove one or two stones)."""
+        move_combo = Board.normalize_move(move_combo)
+        for (r, c) in move_combo:
+            if self.inside(r, c) and self.grid[r][c] != Board.EMPTY:
+                self._remove(r, c)
+        # apply_pair records its stones as a tuple, apply_move as a list
+        if self.history and list(self.history[-1][0]) == list(move_combo):
+            self.history.pop()
+
+    def encode_move(self, stones):
         """
-        Undo a move (remove one or two stones).
-        Normalize move_combo into a list of (r, c) tuples.
+        Pack one or two (r, c) stones into a single int for the search: cell
+        indices a < b (index = r * size + c) become a + (b + 1) * size**2, and
+        a single stone is just its index.
         """
-        if isinstance(move_combo, tuple) and isinstance(move_combo[0], int):
-            move_combo = [move_combo]
+        n = self.size
+        if len(stones) == 1:
+            r, c = stones[0]
+            return r * n + c
+        (r1, c1), (r2, c2) = stones
+        a, b = r1 * n + c1, r2 * n + c2
+        if a > b:
+            a, b = b, a
+        return a + (b + 1) * self.area
 
-        if isinstance(move_combo, list) and len(move_combo) == 1 and isinstance(move_combo[0], tuple):
-            inner = move_combo[0]
-            if isinstance(inner[0], tuple):  # e.g. [((r, c))]
-                move_combo = [inner[0]]
+    def decode_move(self, code):
+        """The (r, c) stones of an encode_move code, as a tuple."""
+        b, a = divmod(code, self.area)
+        if b == 0:
+            return (self.coords[a],)
+        return self.coords[a], self.coords[b - 1]
 
-        for (r, c) in move_combo:
-            if self.inside(r, c):
-                self.grid[r][c] = Board.EMPTY
+    def apply_pair(self, code, player):
+        """
+        apply_move for an encoded move, without the checks: the search only
+        plays moves it generated on empty cells.
+        """
+        b, a = divmod(code, self.area)
+        coords = self.coords
+        r, c = coords[a]
+        self._place(r, c, player)
+        if b == 0:
+            self.history.append(((coords[a],), player))
+        else:
+            r2, c2 = coords[b - 1]
+            self._place(r2, c2, player)
+            self.history.append(((coords[a], coords[b - 1]), player))
+
+    def undo_pair(self, code):
+        """Take back the last apply_pair."""
+        b, a = divmod(code, self.area)
+        r, c = self.coords[a]
+        self._remove(r, c)
+        if b:
+            r, c = self.coords[b - 1]
+            self._remove(r, c)
+        self.history.pop()
+
+    def _place(self, r, c, player):
+        """Put one stone on an empty cell. Subclasses hook their own state here."""
+        self.grid[r][c] = player
+        self.stone_count += 1
+        self.hash ^= self.zobrist[player][r * self.size + c]
+        self.frontier.discard((r, c))
+        near_counts, coords, grid = self.near_counts, self.coords, self.grid
+        for i in self.near[r * self.size + c]:
+            near_counts[i] += 1
+            if near_counts[i] == 1:
+                cell = coords[i]
+                if grid[cell[0]][cell[1]] == Board.EMPTY:
+                    self.frontier.add(cell)
+        for listener in self.listeners:
+            listener.on_place(r, c, player)
+
+    def _remove(self, r, c):
+        """Take one stone off an occupied cell."""
+        player = self.grid[r][c]
+        self.hash ^= self.zobrist[player][r * self.size + c]
+        self.grid[r][c] = Board.EMPTY
+        self.stone_count -= 1
+        near_counts, coords = self.near_counts, self.coords
+        for i in self.near[r * self.size + c]:
+            near_counts[i] -= 1
+            if near_counts[i] == 0:
+                self.frontier.discard(coords[i])
+        if self.near_counts[r * self.size + c] > 0:
+            self.frontier.add((r, c))
+        for listener in self.listeners:
+            listener.on_remove(r, c, player)
+
+    def candidate_cells(self):
+        """
+        Empty cells within near_radius of a stone, or every cell on an empty board.
+        Maintained incrementally, so this costs O(frontier) rather than O(N^2).
+        """
+        if self.stone_count == 0:
+            return [(r, c) for r in range(self.size) for c in range(self.size)]
+        return sorted(self.frontier)
+
+    def add_listener(self, listener):
+        """
+        Register an object whose on_place(r, c, player) / on_remove(r, c, player)
+        run after every stone change. Listeners are not carried over by copy().
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def stones(self):
+        """(r, c, player) for every stone, in row-major order."""
+        return [(r, c, v) for r, row in enumerate(self.grid) for c, v in enumerate(row) if v]
 
     def check_win(self, player):
         """Check if the given player has a winning line of length win_k."""
@@ -67,22 +241,76 @@ class Board:
                         nc += dc
         return False
 
+    def check_win_at(self, move_combo, player):
+        """
+        Check for a winning line through the given stones only.
+        Costs O(stones * 4 * win_k) instead of a full-board scan.
+        """
+        grid = self.grid
+        N = self.size
+        for (r, c) in Board.normalize_move(move_combo):
+            if grid[r][c] != player:
+                continue
+            for dr, dc in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                count = 1
+                nr, nc = r + dr, c + dc
+                while 0 <= nr < N and 0 <= nc < N and grid[nr][nc] == player:
+                    count += 1
+                    nr += dr
+                    nc += dc
+                nr, nc = r - dr, c - dc
+                while 0 <= nr < N and 0 <= nc < N and grid[nr][nc] == player:
+                    count += 1
+                    nr -= dr
+                    nc -= dc
+                if count >= self.win_k:
+                    return True
+        return False
+
+    def last_winner(self):
+        """Return the player whose last move completed a line, or None."""
+        if not self.history:
+            return None
+        stones, player = self.history[-1]
+        return player if self.check_win_at(stones, player) else None
+
     def check_draw(self):
         """Check if the board is full (draw)."""
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.grid[r][c] == Board.EMPTY:
-                    return False
-        return True
+        return self.stone_count >= self.size * self.size
 
     def reset(self):
         """Reset the board to empty state."""
+        if self.listeners:
+            # Take stones off one at a time so listeners stay in sync
+            for r in range(self.size):
+                for c in range(self.size):
+                    if self.grid[r][c] != Board.EMPTY:
+                        self._remove(r, c)
         self.grid = [[Board.EMPTY for _ in range(self.size)] for _ in range(self.size)]
+        self.stone_count = 0
+        self.history = []
+        self.hash = 0
+        self.near_counts = [0] * (self.size * self.size)
+        self.frontier = set()
 
     def copy(self):
         """Return a deep copy of the board for search algorithms."""
-        new_board = Board(size=self.size, win_k=self.win_k)
+        new_board = type(self)(size=self.size, win_k=self.win_k, near_radius=self.near_radius)
         new_board.grid = [row[:] for row in self.grid]
+        new_board.stone_count = self.stone_count
+        new_board.hash = self.hash
+        new_board.near_counts = self.near_counts[:]
+        new_board.frontier = set(self.frontier)
+        new_board.history = [(list(stones), player) for stones, player in self.history]
+        return new_board
+
+    @classmethod
+    def from_board(cls, board_obj):
+        """The position of board_obj (stones and history) on a board of this class."""
+        new_board = cls(size=board_obj.size, win_k=board_obj.win_k, near_radius=board_obj.near_radius)
+        for r, c, v in board_obj.stones():
+            new_board._place(r, c, v)
+        new_board.history = [(list(stones), player) for stones, player in board_obj.history]
         return new_board
 
     def __str__(self):
@@ -0,0 +1,206 @@
+# candidates.py
+
+import heapq
+from itertools import combinations
+
+from board import stones_of
+
+DIRS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+def run_length(board_grid, r, c, dr, dc, player):
+    """Stones of player in a row starting next to (r, c) and heading (dr, dc)."""
+    N = len(board_grid)
+    count = 0
+    r += dr
+    c += dc
+    while 0 <= r < N and 0 <= c < N and board_grid[r][c] == player:
+        count += 1
+        r += dr
+        c += dc
+    return count
+
+
+def creates_block(board_grid, r, c, opp_player, win_k=6):
+    """
+    True if the opponent playing (r, c) would make an open line of at least
+    win_k - 1 through that cell. Only the four lines through (r, c) are read.
+    """
+    N = len(board_grid)
+    for dr, dc in DIRS:
+        left = run_length(board_grid, r, c, -dr, -dc, opp_player)
+        right = run_length(board_grid, r, c, dr, dc, opp_player)
+        if left + 1 + right < win_k - 1:
+            continue
+        end1_r, end1_c = r - (left + 1) * dr, c - (left + 1) * dc
+        end2_r, end2_c = r + (right + 1) * dr, c + (right + 1) * dc
+        if (0 <= end1_r < N and 0 <= end1_c < N and board_grid[end1_r][end1_c] == 0) or \
+           (0 <= end2_r < N and 0 <= end2_c < N and board_grid[end2_r][end2_c] == 0):
+            return True
+    return False
+
+
+def cell_score(board_grid, r, c, my_player, opp_player, win_k=6):
+    """
+    Cheap single-cell score: for each direction, the runs the cell would
+    extend for the mover (attack) and would cut for the opponent (defense).
+    Longer runs weigh much more; attack edges out defense at equal length.
+    """
+    score = 0
+    for dr, dc in DIRS:
+        mine = run_length(board_grid, r, c, dr, dc, my_player) + run_length(board_grid, r, c, -dr, -dc, my_player)
+        theirs = run_length(board_grid, r, c, dr, dc, opp_player) + run_length(board_grid, r, c, -dr, -dc, opp_player)
+        score += 4 ** min(mine, win_k) + 3 ** min(theirs, win_k)
+    return score
+
+
+def best_first_pairs(items, weights):
+    """
+    Yield every pair of items, highest weights[i] + weights[j] first, for
+    items already sorted by non-increasing weight. A best-first merge: the
+    heap never holds more than len(items) pairs, and nothing past the pair a
+    caller stops at is ever built.
+    """
+    n = len(items)
+    if n < 2:
+        return
+    heap = [(-(weights[0] + weights[1]), 0, 1)]
+    while heap:
+        _, i, j = heapq.heappop(heap)
+        yield items[i], items[j]
+        # (i, j) is the only parent of (i, j + 1); (i, i + 1) also opens row i + 1
+        if j + 1 < n:
+            heapq.heappush(heap, (-(weights[i] + weights[j + 1]), i, j + 1))
+            if j == i + 1:
+                heapq.heappush(heap, (-(weights[j] + weights[j + 1]), j, j + 1))
+
+
+def stream_moves(cells, k, size, front=(), history=None):
+    """
+    Lazy, ordered Board.encode_move codes of every k-stone move (k is 1 or 2)
+    over cells, for a full-width search that may cut off after a few moves.
+
+    The moves in front (TT, PV, killer moves) come first, if they are legal
+    here. Then pairs follow best first: each cell weighs its place in cells
+    (the caller's order, best first), outranked by its history bonus when a
+    history table is given.
+    """
+    area = size * size
+    index = [r * size + c for r, c in cells]
+    allowed = set(index)
+    tried = set()
+    for code in front:
+        if code is None or code in tried:
+            continue
+        second, first = divmod(code, area)
+        if first in allowed and (second - 1 in allowed if k == 2 else second == 0):
+            tried.add(code)
+            yield code
+    if k == 1:
+        for i in index:
+            if i not in tried:
+                yield i
+        return
+    n = len(index)
+    if history:
+        weighted = sorted(((history.get(i, 0) * 2 * n + n - rank, i) for rank, i in enumerate(index)), reverse=True)
+        weights = [w for w, _ in weighted]
+        index = [i for _, i in weighted]
+    else:
+        weights = range(n, 0, -1)
+    for a, b in best_first_pairs(index, weights):
+        code = a + (b + 1) * area if a < b else b + (a + 1) * area
+        if code not in tried:
+            yield code
+
+
+def threat_windows(board_grid, player, opp_player, win_k=6, stones_per_move=2):
+    """
+    Windows the player can finish on their next move: at least
+    win_k - stones_per_move of their stones and none of the opponent's.
+    Returns a list of the empty cells of each such window.
+    """
+    N = len(board_grid)
+    need = win_k - stones_per_move
+    seen = set()
+    found = []
+    for r, c in stones_of(board_grid, player):
+        for dr, dc in DIRS:
+            # every window through (r, c) in this direction
+            for back in range(win_k):
+                sr, sc = r - back * dr, c - back * dc
+                er, ec = sr + (win_k - 1) * dr, sc + (win_k - 1) * dc
+                if not (0 <= sr < N and 0 <= sc < N and 0 <= er < N and 0 <= ec < N):
+                    continue
+                key = (sr, sc, dr, dc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                mine, empties = 0, []
+                for i in range(win_k):
+                    v = board_grid[sr + i * dr][sc + i * dc]
+                    if v == player:
+                        mine += 1
+                    elif v == 0:
+                        empties.append((sr + i * dr, sc + i * dc))
+                    else:
+                        break
+                else:
+                    if mine >= need:
+                        found.append(empties)
+    return found
+
+
+class CandidateGenerator:
+    """
+    Narrows the candidate cells to a configurable top-K before pairing them.
+
+    Moves that must be considered are always included: a pair that completes
+    the mover's own line, and every pair that blocks all of the opponent's
+    immediate threats (their fours and fives).
+    """
+
+    def __init__(self, top_k=12, win_k=6):
+        self.top_k = top_k
+        self.win_k = win_k
+
+    def ranked_cells(self, board_grid, moves, player, opp_player):
+        scored = [(cell_score(board_grid, r, c, player, opp_player, self.win_k), (r, c)) for (r, c) in moves]
+        scored.sort(key=lambda x: -x[0])
+        return scored
+
+    def combos(self, board_grid, moves, k, player, opp_player):
+        """Ordered list of k-stone moves (k is 1 or 2) for the player to move."""
+        if k <= 0 or not moves:
+            return []
+        # Winning move available: nothing else matters
+        for empties in threat_windows(board_grid, player, opp_player, self.win_k, k):
+            win = list(empties)
+            for cell in moves:
+                if len(win) >= k:
+                    break
+                if cell not in win:
+                    win.append(cell)
+            return [tuple(win)]
+
+        ranked = self.ranked_cells(board_grid, moves, player, opp_player)
+        score_of = {cell: s for s, cell in ranked}
+        top = [cell for _, cell in ranked[:self.top_k]]
+
+        threats = threat_windows(board_grid, opp_player, player, self.win_k, k)
+        if threats:
+            blockers = sorted({cell for empties in threats for cell in empties},
+                              key=lambda cell: -score_of.get(cell, 0))
+            partners = blockers + [cell for cell in top if cell not in blockers]
+            forced = [combo for combo in combinations(partners, k)
+                      if all(any(cell in empties for cell in combo) for empties in threats)]
+            if forced:
+                # Anything that leaves a threat open loses on the spot
+                forced.sort(key=lambda combo: -sum(score_of.get(cell, 0) for cell in combo))
+                return forced
+            # More threats than stones: the game is lost, but block what we can
+            top = partners
+
+        pairs = list(combinations(top, k))
+        pairs.sort(key=lambda combo: -sum(score_of.get(cell, 0) for cell in combo))
+        return pairs
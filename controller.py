@@ -45,7 +45,7 @@ class GameController:
         self._moves_played += 1
 
         # Check win/draw
-        if self.board.check_win(player_color):
+        if self.board.check_win_at(move_combo, player_color):
             self.game_over = True
             self.winner = self.current_player
         elif self.board.check_draw():
@@ -73,7 +73,7 @@ class GameController:
 
         if move:
             self._moves_played += 1
-            if self.board.check_win(self.current_player.color):
+            if self.board.check_win_at(move, self.current_player.color):
                 self.game_over = True
                 self.winner = self.current_player
             elif self.board.check_draw():
@@ -0,0 +1,319 @@
+# engine_server.py
+"""
+The search engines behind a line-based text protocol, so frontends and
+batch tools can keep one warm engine process instead of importing the
+engine (and rebuilding its tables) for every game.
+
+    python engine_server.py                   # one client on stdin/stdout
+    python engine_server.py --port 7777       # also take clients on 127.0.0.1:7777
+
+A move is its stones as r,c joined by "/", e.g. 9,9/9,10. Commands:
+
+    session NAME            switch this client to game session NAME (made on first use)
+    new SIZE [PLAYER]       new game on a SIZE x SIZE board; PLAYER is an engine spec as in
+                            tournament.py, e.g. AlphaBeta,depth=4,time=2,heuristic=pattern
+    position [MOVE ...]     set the game to these moves from the empty board
+    play MOVE               play a move for the side to move
+    go [time=S] [depth=D] [nodes=N]
+                            search for the side to move in the background (nodes is
+                            MCTS's iteration count; an engine without a limit rejects it)
+    stop                    end this session's search early
+    show                    print the board
+    isready                 answered with readyok
+    quit
+
+Commands are answered with "ok ..." or "error ...". A search reports each
+completed depth as "info SESSION depth D score S nodes N time T pv MOVE"
+and ends with "bestmove SESSION MOVE score S"; the move is not played.
+
+Each session keeps its board and engine between commands, so transposition
+tables and move-ordering history stay warm from move to move, and a "new"
+game with the same engine spec and board size reuses the engine. Searches
+of different sessions run at the same time on a thread pool; for several
+cores per search give the engine workers=N.
+"""
+
+import argparse
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from board import Board
+from tournament import parse_player, make_engine
+
+DEFAULT_PLAYER = "AlphaBeta,depth=3,time=2"
+# go limit -> (engine attributes that take it, first one the engine has wins; value type)
+LIMITS = {"time": (("time_limit_sec",), float), "depth": (("max_depth",), int),
+          "nodes": (("node_limit", "max_iterations"), int)}
+
+
+def limit_attr(engine, name):
+    """The engine attribute a go limit sets, or None if the engine has no such limit."""
+    for attr in LIMITS[name][0]:
+        if hasattr(engine, attr):
+            return attr
+    return None
+
+
+def parse_move(token):
+    """'9,9/9,10' -> [(9, 9), (9, 10)]"""
+    stones = []
+    for cell in token.split("/"):
+        r, _, c = cell.partition(",")
+        stones.append((int(r), int(c)))
+    return stones
+
+
+def format_move(stones):
+    return "/".join(f"{r},{c}" for r, c in stones)
+
+
+class Session:
+    """One game: its board, the moves so far and the engine that searches it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.spec = None
+        self.engine = None
+        self.board = None
+        self.moves = []
+        self.result = None  # "win 1", "win 2" or "draw" once the game is over
+        self.search = None  # Future of the running go, if any
+
+    @property
+    def to_move(self):
+        return 1 if len(self.moves) % 2 == 0 else 2
+
+    def busy(self):
+        return self.search is not None and not self.search.done()
+
+    def new(self, size, spec):
+        if size < 6:
+            raise ValueError("board size must be at least 6")
+        if self.engine is None or spec != self.spec or size != self.board.size:
+            engine = make_engine(parse_player(spec))
+            self.close()
+            self.engine, self.spec = engine, spec
+        self.board = Board(size)
+        self.moves = []
+        self.result = None
+
+    def play(self, stones):
+        """Apply a move for the side to move; returns the result if it ends the game."""
+        if self.result is not None:
+            raise ValueError(f"game is over ({self.result})")
+        expected = 1 if not self.moves else 2
+        if len(stones) != expected:
+            raise ValueError(f"this move takes {expected} stone{'s' if expected > 1 else ''}")
+        player = self.to_move
+        self.board.apply_move(stones, player)
+        self.moves.append(stones)
+        if self.board.check_win_at(stones, player):
+            self.result = f"win {player}"
+        elif self.board.check_draw():
+            self.result = "draw"
+        return self.result
+
+    def set_position(self, moves):
+        saved = self.board, self.moves, self.result
+        self.board, self.moves, self.result = Board(self.board.size), [], None
+        try:
+            for stones in moves:
+                self.play(stones)
+        except ValueError:
+            self.board, self.moves, self.result = saved
+            raise
+
+    def go(self, limits, write):
+        """Search the current position (on a pool thread) and report as it goes."""
+        engine = self.engine
+        saved = {}
+        for name, value in limits.items():
+            attr = limit_attr(engine, name)
+            saved[attr] = getattr(engine, attr)
+            setattr(engine, attr, value)
+
+        def report(depth, score, nodes, seconds, move):
+            write(f"info {self.name} depth {depth} score {score} nodes {nodes} "
+                  f"time {seconds:.3f} pv {format_move(move)}")
+
+        if hasattr(engine, "on_iteration"):
+            engine.on_iteration = report
+        player = self.to_move
+        try:
+            move, score = engine.choose_move(self.board, player, 3 - player)
+        except Exception as e:
+            write(f"error {self.name} search failed: {e}")
+            return
+        finally:
+            if hasattr(engine, "on_iteration"):
+                engine.on_iteration = None
+            for attr, value in saved.items():
+                setattr(engine, attr, value)
+        if not move:
+            write(f"bestmove {self.name} none")
+            return
+        if not self.moves:
+            move = move[:1]  # the first move of the game is a single stone
+        write(f"bestmove {self.name} {format_move(move)} score {score}")
+
+    def close(self):
+        if self.engine is not None and hasattr(self.engine, "close"):
+            self.engine.close()
+        self.engine = None
+
+
+class EngineServer:
+    """Sessions shared by every client, and the pool their searches run on."""
+
+    def __init__(self, workers=4):
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def session(self, name):
+        with self._lock:
+            if name not in self.sessions:
+                self.sessions[name] = Session(name)
+            return self.sessions[name]
+
+    def serve(self, lines, write):
+        """Answer commands from an iterable of lines; True if it ended with quit."""
+        client = {"session": "main"}
+        for line in lines:
+            if not self.handle(line, client, write):
+                return True
+        return False
+
+    def handle(self, line, client, write):
+        """Run one command; returns False on quit."""
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0].lower(), words[1:]
+        if command == "quit":
+            return False
+        if command == "isready":
+            write("readyok")
+            return True
+        if command == "session":
+            if len(args) != 1:
+                write("error usage: session NAME")
+            else:
+                client["session"] = args[0]
+                self.session(args[0])
+                write(f"ok session {args[0]}")
+            return True
+
+        session = self.session(client["session"])
+        if command == "stop":
+            if session.busy():
+                session.engine.stop()
+            write("ok")
+            return True
+        if command not in ("new", "position", "play", "go", "show"):
+            write(f"error unknown command {command}")
+            return True
+        if session.busy() and command != "show":
+            write(f"error session {session.name} is searching; send stop first")
+            return True
+        if session.board is None and command != "new":
+            write("error no game; send new first")
+            return True
+        try:
+            if command == "new":
+                if not args:
+                    raise ValueError("usage: new SIZE [PLAYER]")
+                session.new(int(args[0]), args[1] if len(args) > 1 else DEFAULT_PLAYER)
+                write(f"ok new {session.board.size} {session.spec}")
+            elif command == "position":
+                session.set_position([parse_move(token) for token in args])
+                write(f"ok {session.result or 'to_move ' + str(session.to_move)}")
+            elif command == "play":
+                if len(args) != 1:
+                    raise ValueError("usage: play MOVE")
+                result = session.play(parse_move(args[0]))
+                write(f"ok {result or 'to_move ' + str(session.to_move)}")
+            elif command == "go":
+                if session.result is not None:
+                    raise ValueError(f"game is over ({session.result})")
+                limits = {}
+                for arg in args:
+                    name, _, value = arg.partition("=")
+                    if name not in LIMITS:
+                        raise ValueError(f"unknown limit {name}")
+                    if limit_attr(session.engine, name) is None:
+                        raise ValueError(f"{type(session.engine).__name__} has no {name} limit")
+                    limits[name] = LIMITS[name][1](value)
+                # Clear an old stop() here rather than when the search starts, so a
+                # stop sent while this go waits for a pool thread still counts
+                session.engine.resume()
+                session.search = self.pool.submit(session.go, limits, write)
+                write("ok")
+            elif command == "show":
+                write(str(session.board))
+                write(f"ok {session.result or 'to_move ' + str(session.to_move)}")
+        except (ValueError, KeyError, TypeError) as e:
+            write(f"error {e}")
+        return True
+
+    def close(self):
+        for session in self.sessions.values():
+            if session.busy():
+                session.engine.stop()
+        self.pool.shutdown(wait=True)
+        for session in self.sessions.values():
+            session.close()
+
+
+class _Client(socketserver.StreamRequestHandler):
+    def handle(self):
+        lock = threading.Lock()
+
+        def write(text):
+            with lock:
+                try:
+                    self.wfile.write((text + "\n").encode())
+                    self.wfile.flush()
+                except OSError:
+                    pass  # client went away; its search results are dropped
+
+        lines = (raw.decode(errors="replace") for raw in self.rfile)
+        self.server.engine_server.serve(lines, write)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Connect 6 engines over a text protocol.")
+    parser.add_argument("--port", type=int, help="also listen on 127.0.0.1:PORT, one session set for all clients")
+    parser.add_argument("--workers", type=int, default=4, help="searches that can run at once")
+    args = parser.parse_args(argv)
+
+    server = EngineServer(args.workers)
+    tcp = None
+    if args.port is not None:
+        tcp = socketserver.ThreadingTCPServer(("127.0.0.1", args.port), _Client)
+        tcp.daemon_threads = True
+        tcp.engine_server = server
+        threading.Thread(target=tcp.serve_forever, daemon=True).start()
+
+    lock = threading.Lock()
+
+    def write(text):
+        with lock:
+            print(text, flush=True)
+
+    try:
+        if not server.serve(sys.stdin, write) and tcp is not None:
+            # stdin closed without quit (e.g. started in the background): keep serving sockets
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tcp is not None:
+            tcp.shutdown()
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# gamerecord.py
+"""
+Compact binary game records, many games to a file.
+
+A file starts with MAGIC and a format version. Each game follows as a
+fixed header (board size, win_k, result, number of stones, tag length),
+a UTF-8 tag (free text such as the players) and the stones as 16-bit cell
+indices r * size + c in the order they were played. Moves are not stored
+separately: the first move is one stone and every later move two, except
+that a game ending on an odd stone (a board filled to the last cell) has a
+one-stone last move. Player 1 moves first.
+
+    with GameWriter("games.c6g") as writer:
+        writer.write(GameRecord(19, moves, result=1, tag="AlphaBeta vs Minimax"))
+    for record in read_records("games.c6g"):
+        ...
+
+read_records yields one game at a time, so a corpus never has to fit in
+memory.
+"""
+
+import struct
+
+from board import Board
+
+MAGIC = b"C6GR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+RECORD = struct.Struct("<BBBHB")  # size, win_k, result, stones, tag length
+
+# result byte: no result (unfinished or unknown), a winner, or a draw
+NO_RESULT, DRAW = 0, 3
+
+
+class GameRecord:
+    """One game: board size, moves as lists of (r, c), result and a tag."""
+
+    def __init__(self, size, moves, result=None, win_k=6, tag=""):
+        self.size = size
+        self.moves = [list(stones) for stones in moves]
+        self.result = result  # 1 or 2 for the winner, "draw", or None
+        self.win_k = win_k
+        self.tag = tag
+
+    @classmethod
+    def from_board(cls, board_obj, result=None, tag=""):
+        """The moves applied to board_obj so far (its history), as a record."""
+        return cls(board_obj.size, [stones for stones, _ in board_obj.history], result, board_obj.win_k, tag)
+
+    def positions(self, board_cls=Board):
+        """
+        Replay the game, yielding (board, move, player) before each move is
+        played. The board is the same object throughout and is only valid
+        until the next item is taken.
+        """
+        board = board_cls(size=self.size, win_k=self.win_k)
+        for i, stones in enumerate(self.moves):
+            player = 1 if i % 2 == 0 else 2
+            yield board, stones, player
+            board.apply_move(stones, player)
+
+    def pack(self):
+        size = self.size
+        if not 6 <= size <= 255:
+            raise ValueError(f"board size {size} does not fit a game record")
+        cells = []
+        for i, stones in enumerate(self.moves):
+            last = i == len(self.moves) - 1
+            if len(stones) != (1 if i == 0 else 2) and not (last and len(stones) == 1):
+                raise ValueError(f"move {i + 1} has {len(stones)} stones")
+            cells.extend(r * size + c for r, c in stones)
+        tag = self.tag.encode()[:255]
+        result = DRAW if self.result == "draw" else self.result or NO_RESULT
+        return (RECORD.pack(size, self.win_k, result, len(cells), len(tag)) + tag
+                + struct.pack(f"<{len(cells)}H", *cells))
+
+    @classmethod
+    def unpack_from(cls, f):
+        """Read the next record from a binary file; None at the end of the file."""
+        header = f.read(RECORD.size)
+        if not header:
+            return None
+        if len(header) < RECORD.size:
+            raise ValueError("truncated game record")
+        size, win_k, result, count, tag_len = RECORD.unpack(header)
+        tag = f.read(tag_len)
+        body = f.read(2 * count)
+        if len(tag) < tag_len or len(body) < 2 * count:
+            raise ValueError("truncated game record")
+        cells = struct.unpack(f"<{count}H", body)
+        moves = [[divmod(cells[0], size)]] if cells else []
+        for i in range(1, count, 2):
+            moves.append([divmod(cell, size) for cell in cells[i:i + 2]])
+        result = "draw" if result == DRAW else result or None
+        return cls(size, moves, result, win_k, tag.decode(errors="replace"))
+
+
+class GameWriter:
+    """Appends records to a game file, writing the file header if the file is new."""
+
+    def __init__(self, path):
+        self.f = open(path, "ab")
+        if self.f.tell() == 0:
+            self.f.write(FILE_HEADER.pack(MAGIC, VERSION))
+        else:
+            with open(path, "rb") as existing:
+                _check_header(existing)
+        self.count = 0
+
+    def write(self, record):
+        self.f.write(record.pack())
+        self.count += 1
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(f):
+    header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError("not a game record file")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("not a game record file")
+    if version != VERSION:
+        raise ValueError(f"game record version {version} is not supported")
+
+
+def read_records(path):
+    """Yield the GameRecords of a file one at a time."""
+    with open(path, "rb") as f:
+        _check_header(f)
+        while True:
+            record = GameRecord.unpack_from(f)
+            if record is None:
+                return
+            yield record
@@ -1,15 +1,28 @@
 # gui.py
 
+import os
 import tkinter as tk
 from tkinter import messagebox
 import threading
 
 from board import Board
+from sparse_board import SparseBoard
 from controller import GameController, HumanPlayer
 from Ai_Player import AI_Player
 from minimax import Minimax
 from alphabeta import AlphaBeta
+from mcts import MCTS
 from heuristics import heuristic1, heuristic2
+from ponder import Ponderer
+from opening_book import OpeningBook
+from timecontrol import TimeManager
+
+# Used by the AI when present (build one with: python opening_book.py opening_book.bin)
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+# Search results kept between moves and games when "Keep search cache" is on
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.tt")
+# Boards at least this big keep only their stones (SparseBoard)
+SPARSE_MIN_SIZE = 40
 
 class Connect6GUI:
     def __init__(self, master):
@@ -20,9 +33,13 @@ class Connect6GUI:
         self.ai_depth = tk.IntVar(value=2)  # Lower default for responsiveness
         self.ai_heuristic = tk.StringVar(value="heuristic2")  # Heuristic2 tends to be stronger
         self.ai_algo = tk.StringVar(value="AlphaBeta")
+        self.ai_ponder = tk.BooleanVar(value=True)  # think during the human's turn
+        self.ai_clock = tk.DoubleVar(value=3.0)  # minutes of thinking time for the whole game
+        self.ai_cache = tk.BooleanVar(value=True)  # reuse the on-disk transposition table
 
         self.board = None
         self.controller = None
+        self.ai_player = None
 
         self.cell_size = 30
         self.board_padding = 5
@@ -47,9 +64,16 @@ class Connect6GUI:
         tk.OptionMenu(self.setup_frame, self.ai_heuristic, "heuristic1", "heuristic2").grid(row=2, column=1, sticky="ew")
 
         tk.Label(self.setup_frame, text="Algorithm:").grid(row=3, column=0, sticky="w")
-        tk.OptionMenu(self.setup_frame, self.ai_algo, "AlphaBeta", "Minimax").grid(row=3, column=1, sticky="ew")
+        tk.OptionMenu(self.setup_frame, self.ai_algo, "AlphaBeta", "Minimax", "MCTS").grid(row=3, column=1, sticky="ew")
+
+        tk.Label(self.setup_frame, text="AI Clock (minutes):").grid(row=4, column=0, sticky="w")
+        tk.Entry(self.setup_frame, textvariable=self.ai_clock).grid(row=4, column=1, sticky="ew")
+
+        tk.Checkbutton(self.setup_frame, text="Ponder on human's turn", variable=self.ai_ponder).grid(row=5, column=0, columnspan=2, sticky="w")
+
+        tk.Checkbutton(self.setup_frame, text="Keep search cache between games", variable=self.ai_cache).grid(row=6, column=0, columnspan=2, sticky="w")
 
-        tk.Button(self.setup_frame, text="Start Game", command=self.start_game).grid(row=4, column=0, columnspan=2, pady=8)
+        tk.Button(self.setup_frame, text="Start Game", command=self.start_game).grid(row=7, column=0, columnspan=2, pady=8)
 
     def start_game(self):
         try:
@@ -63,7 +87,12 @@ class Connect6GUI:
                 return
 
             heuristic_func = heuristic1 if heuristic_name == "heuristic1" else heuristic2
-            self.board = Board(size=size)
+            board_cls = SparseBoard if size >= SPARSE_MIN_SIZE else Board
+            self.board = board_cls(size=size)
+            # Per-move time comes from the game clock; AI_Player sets it before each search
+            time_manager = TimeManager(total_sec=self.ai_clock.get() * 60)
+            time_limit = time_manager.allocate(self.board)
+            tt_path = CACHE_PATH if self.ai_cache.get() else None
 
             human_player = HumanPlayer(1)
             if algo_name == "AlphaBeta":
@@ -73,7 +102,16 @@ class Connect6GUI:
                     win_k=self.board.win_k,
                     near_radius=2,
                     iterative_deepening=True,
-                    time_limit_sec=5.0
+                    time_limit_sec=time_limit,
+                    max_candidates=12,
+                    collect_stats=True,
+                    tt_path=tt_path
+                )
+            elif algo_name == "MCTS":
+                ai_algorithm = MCTS(
+                    time_limit_sec=time_limit,
+                    win_k=self.board.win_k,
+                    max_candidates=12
                 )
             else:
                 ai_algorithm = Minimax(
@@ -82,9 +120,16 @@ class Connect6GUI:
                     win_k=self.board.win_k,
                     near_radius=2,
                     iterative_deepening=True,
-                    time_limit_sec=5.0
+                    time_limit_sec=time_limit,
+                    max_candidates=12,
+                    collect_stats=True,
+                    tt_path=tt_path
                 )
-            ai_player = AI_Player(2, ai_algorithm)
+            if self.ai_ponder.get():
+                ai_algorithm = Ponderer(ai_algorithm)
+            book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+            ai_player = AI_Player(2, ai_algorithm, opening_book=book, time_manager=time_manager)
+            self.ai_player = ai_player
 
             self.controller = GameController(self.board, human_player, ai_player, first_move_single=True)
 
@@ -108,38 +153,60 @@ class Connect6GUI:
         self.canvas.pack()
         self.canvas.bind("<Button-1>", self.handle_click)
 
-        self.status_label = tk.Label(self.game_frame, text="")
+        self.status_label = tk.Label(self.game_frame, text="", wraplength=width)
         self.status_label.pack(pady=6)
 
         self.restart_btn = tk.Button(self.game_frame, text="Restart", command=self.restart_game)
         self.restart_btn.pack(pady=4)
 
+        self.draw_grid()
         self.draw_board()
         self.update_status()
 
+    def _cell_box(self, r, c):
+        x1 = c * self.cell_size + self.board_padding
+        y1 = r * self.cell_size + self.board_padding
+        return x1, y1, x1 + self.cell_size, y1 + self.cell_size
+
+    def draw_grid(self):
+        """Draw the empty board once; stones are added on top by draw_board."""
+        n = self.board.size
+        first = self.board_padding
+        last = n * self.cell_size + self.board_padding
+        # One filled square plus the cell borders as lines, instead of n*n rectangles
+        self.canvas.create_rectangle(first, first, last, last, outline="black", fill="#F5DEB3")
+        for i in range(1, n):
+            pos = i * self.cell_size + self.board_padding
+            self.canvas.create_line(first, pos, last, pos, fill="black")
+            self.canvas.create_line(pos, first, pos, last, fill="black")
+        self.highlight_item = self.canvas.create_oval(0, 0, 0, 0, outline="green", width=2, state="hidden")
+        self.stone_items = {}  # (r, c) -> canvas oval of the stone on that cell
+        self.drawn_moves = 0  # how many board.history entries are on the canvas
+
     def draw_board(self):
-        self.canvas.delete("all")
-        for r in range(self.board.size):
-            for c in range(self.board.size):
-                x1 = c * self.cell_size + self.board_padding
-                y1 = r * self.cell_size + self.board_padding
-                x2 = (c + 1) * self.cell_size + self.board_padding
-                y2 = (r + 1) * self.cell_size + self.board_padding
-                self.canvas.create_rectangle(x1, y1, x2, y2, outline="black", fill="#F5DEB3")
-
-                player = self.board.grid[r][c]
-                if player == 1:
-                    self.canvas.create_oval(x1 + 4, y1 + 4, x2 - 4, y2 - 4, fill="red", outline="red")
-                elif player == 2:
-                    self.canvas.create_oval(x1 + 4, y1 + 4, x2 - 4, y2 - 4, fill="blue", outline="blue")
+        """Bring the canvas up to date with the board, touching only cells that changed."""
+        history = self.board.history
+        if len(history) < self.drawn_moves:
+            # Moves were taken back: drop the stones whose cells are empty again
+            grid = self.board.grid
+            for cell in [cell for cell in self.stone_items if grid[cell[0]][cell[1]] == Board.EMPTY]:
+                self.canvas.delete(self.stone_items.pop(cell))
+            self.drawn_moves = len(history)
+        for stones, player in history[self.drawn_moves:]:
+            color = "red" if player == 1 else "blue"
+            for r, c in stones:
+                x1, y1, x2, y2 = self._cell_box(r, c)
+                self.stone_items[(r, c)] = self.canvas.create_oval(x1 + 4, y1 + 4, x2 - 4, y2 - 4,
+                                                                   fill=color, outline=color)
+        self.drawn_moves = len(history)
 
         if self.first_stone_pos is not None:
-            r, c = self.first_stone_pos
-            x1 = c * self.cell_size + self.board_padding
-            y1 = r * self.cell_size + self.board_padding
-            x2 = (c + 1) * self.cell_size + self.board_padding
-            y2 = (r + 1) * self.cell_size + self.board_padding
-            self.canvas.create_oval(x1 + 8, y1 + 8, x2 - 8, y2 - 8, outline="green", width=2)
+            x1, y1, x2, y2 = self._cell_box(*self.first_stone_pos)
+            self.canvas.coords(self.highlight_item, x1 + 8, y1 + 8, x2 - 8, y2 - 8)
+            self.canvas.itemconfigure(self.highlight_item, state="normal")
+            self.canvas.tag_raise(self.highlight_item)
+        else:
+            self.canvas.itemconfigure(self.highlight_item, state="hidden")
 
     def handle_click(self, event):
         if self.controller.game_over or self._ai_running:
@@ -238,24 +305,53 @@ class Connect6GUI:
         self._ai_running = True
         self.update_status(extra="AI thinking...")
 
+        controller, imp = self.controller, self.ai_player.imp
+
         def ai_task():
-            move, score = self.controller.ai_move()
+            move, score = controller.ai_move()
             # Schedule GUI updates safely on the main thread
-            self.master.after(0, lambda: self.after_ai_move(move, score))
+            self.master.after(0, lambda: self.ai_task_done(controller, imp, move, score))
 
         t = threading.Thread(target=ai_task, daemon=True)
         t.start()
 
+    def ai_task_done(self, controller, imp, move, score):
+        if controller is not self.controller:
+            # The game was restarted while the AI was thinking: drop the move
+            # and close the engine restart_game could not close mid-search
+            if hasattr(imp, "close"):
+                imp.close()
+            return
+        self.after_ai_move(move, score)
+
     def after_ai_move(self, move, score):
         self._ai_running = False
         if move:
             self.draw_board()
-            self.update_status(extra=f"AI evaluated: {score:.2f}" if score is not None else None)
+            extra = f"AI evaluated: {score:.2f}" if score is not None else None
+            stats = self.ai_player.last_stats if self.ai_player is not None else None
+            if stats is not None:
+                extra = f"{extra} ({stats.summary()})" if extra else stats.summary()
+            self.update_status(extra=extra)
+            self.start_pondering()
         else:
             messagebox.showerror("AI Error", "AI could not make a move.")
             self.controller.game_over = True
             self.update_status(extra="AI failed to move. Game ended.")
 
+    def start_pondering(self):
+        """Let the AI search its likely reply while the human thinks."""
+        imp = self.ai_player.imp if self.ai_player is not None else None
+        if self.controller.game_over or not hasattr(imp, "ponder"):
+            return
+        opp_color = 1 if self.ai_player.color == 2 else 2
+        imp.ponder(self.board, self.ai_player.color, opp_color)
+
+    def stop_pondering(self):
+        imp = self.ai_player.imp if self.ai_player is not None else None
+        if hasattr(imp, "ponder"):
+            imp.stop()
+
     def update_status(self, extra=None):
         if self.controller.game_over:
             if self.controller.winner:
@@ -273,11 +369,21 @@ class Connect6GUI:
             self.status_label.config(text=base)
 
     def restart_game(self):
+        self.stop_pondering()
+        imp = self.ai_player.imp if self.ai_player is not None else None
+        if self._ai_running:
+            # Cut the AI's search short; ai_task_done closes the engine once it returns
+            engine = getattr(imp, "engine", imp)
+            if hasattr(engine, "stop"):
+                engine.stop()
+        elif hasattr(imp, "close"):
+            imp.close()
         if hasattr(self, 'game_frame'):
             self.game_frame.destroy()
         self.first_stone_pos = None
         self.board = None
         self.controller = None
+        self.ai_player = None
         self._ai_running = False
         self.create_setup_frame()
 
@@ -1,5 +1,7 @@
 # heuristics.py
 
+from board import stones_of
+
 def count_stones(board, r, c, dr, dc, player):
     count = 0
     N = len(board)
@@ -14,24 +16,21 @@ def longest_chain_open(board, player):
     N = len(board)
     best_length = 0
     best_open = 0
-    for r in range(N):
-        for c in range(N):
-            if board[r][c] != player:
-                continue
-            for dr, dc in DIRS:
-                left  = count_stones(board, r - dr, c - dc, -dr, -dc, player)
-                right = count_stones(board, r + dr, c + dc,  dr,  dc, player)
-                length = left + 1 + right
-                end1_r = r - (left + 1) * dr
-                end1_c = c - (left + 1) * dc
-                end2_r = r + (right + 1) * dr
-                end2_c = c + (right + 1) * dc
-                def is_open(rr, cc):
-                    return 0 <= rr < N and 0 <= cc < N and board[rr][cc] == 0
-                open_ends = int(is_open(end1_r, end1_c)) + int(is_open(end2_r, end2_c))
-                if open_ends > 0 and length > best_length:
-                    best_length = length
-                    best_open = open_ends
+    for r, c in stones_of(board, player):
+        for dr, dc in DIRS:
+            left  = count_stones(board, r - dr, c - dc, -dr, -dc, player)
+            right = count_stones(board, r + dr, c + dc,  dr,  dc, player)
+            length = left + 1 + right
+            end1_r = r - (left + 1) * dr
+            end1_c = c - (left + 1) * dc
+            end2_r = r + (right + 1) * dr
+            end2_c = c + (right + 1) * dc
+            def is_open(rr, cc):
+                return 0 <= rr < N and 0 <= cc < N and board[rr][cc] == 0
+            open_ends = int(is_open(end1_r, end1_c)) + int(is_open(end2_r, end2_c))
+            if open_ends > 0 and length > best_length:
+                best_length = length
+                best_open = open_ends
     return best_length, best_open
 
 def heuristic1(board, my_player, opp_player, win_k=6, depth=None):
@@ -47,17 +46,15 @@ def heuristic1(board, my_player, opp_player, win_k=6, depth=None):
 def mobility(board, player):
     N = len(board)
     moves = set()
-    for r in range(N):
-        for c in range(N):
-            if board[r][c] == player:
-                for dr in [-1,0,1]:
-                    for dc in [-1,0,1]:
-                        if dr == 0 and dc == 0:
-                            continue
-                        nr = r + dr
-                        nc = c + dc
-                        if 0 <= nr < N and 0 <= nc < N and board[nr][nc] == 0:
-                            moves.add((nr, nc))
+    for r, c in stones_of(board, player):
+        for dr in [-1,0,1]:
+            for dc in [-1,0,1]:
+                if dr == 0 and dc == 0:
+                    continue
+                nr = r + dr
+                nc = c + dc
+                if 0 <= nr < N and 0 <= nc < N and board[nr][nc] == 0:
+                    moves.add((nr, nc))
     return len(moves)
 
 def threat(board, player):
@@ -68,11 +65,9 @@ def center_control(board, player):
     N = len(board)
     midR, midC = (N - 1) // 2, (N - 1) // 2
     total = 0
-    for r in range(N):
-        for c in range(N):
-            if board[r][c] == player:
-                dist = abs(r - midR) + abs(c - midC)
-                total += -dist
+    for r, c in stones_of(board, player):
+        dist = abs(r - midR) + abs(c - midC)
+        total += -dist
     return total
 
 def heuristic2(board, my_player, opp_player, A=2, B=3, C=1, win_k=6, depth=None):
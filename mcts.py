@@ -0,0 +1,189 @@
+# mcts.py
+
+import math
+import random
+import threading
+import time
+
+from candidates import CandidateGenerator, cell_score
+
+
+class _Node:
+    __slots__ = ("move", "parent", "player", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, move, parent, player):
+        self.move = move          # stones placed to reach this node
+        self.parent = parent
+        self.player = player      # player who placed them
+        self.children = []
+        self.untried = None       # ordered candidate moves, filled on first expansion
+        self.visits = 0
+        self.wins = 0.0           # from self.player's point of view
+        self.terminal = None      # winner (or 0 for a draw) once known
+
+
+class MCTS:
+    """
+    Monte Carlo Tree Search (UCT) engine with the same choose_move interface
+    as Minimax/AlphaBeta.
+
+    Children are added by progressive widening: a node with n visits may have
+    at most ceil(widening_c * n ** widening_alpha) children, taken in the
+    order the candidate generator ranks the stone pairs. Leaves are scored by
+    fast playouts over the near-stone frontier: each stone is the best of
+    playout_sample random frontier cells by candidates.cell_score, so lines
+    actually get built and blocked. Playouts stop after playout_moves moves
+    and count as a draw if nobody has won by then.
+    The returned score is the chosen move's win rate for my_player.
+    """
+
+    def __init__(self,
+                 time_limit_sec=2.0,
+                 stones_per_move=2,
+                 win_k=6,
+                 exploration=1.4,
+                 widening_c=2.0,
+                 widening_alpha=0.5,
+                 max_candidates=12,
+                 playout_moves=30,
+                 playout_sample=4,
+                 max_iterations=None,
+                 seed=None):
+        self.time_limit_sec = time_limit_sec
+        self.stones_per_move = stones_per_move
+        self.win_k = win_k
+        self.exploration = exploration
+        self.widening_c = widening_c
+        self.widening_alpha = widening_alpha
+        self.playout_moves = playout_moves
+        self.playout_sample = playout_sample
+        self.max_iterations = max_iterations
+        self.candidates = CandidateGenerator(max_candidates, win_k)
+        self.rng = random.Random(seed)
+        self.iterations = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ask a running choose_move to return as soon as possible."""
+        self._stop_event.set()
+
+    def resume(self):
+        self._stop_event.clear()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_stop_event'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop_event = threading.Event()
+
+    def _moves_for(self, board_obj, player, opp_player):
+        # Centre first, as AlphaBeta.get_moves does, so the generator's score ties
+        # (every cell on an empty board) keep central cells rather than row 0
+        center = board_obj.size // 2
+        moves = sorted(board_obj.candidate_cells(), key=lambda m: abs(m[0] - center) + abs(m[1] - center))
+        k = min(self.stones_per_move, len(moves))
+        return self.candidates.combos(board_obj.grid, moves, k, player, opp_player)
+
+    def _can_widen(self, node):
+        allowed = math.ceil(self.widening_c * max(1, node.visits) ** self.widening_alpha)
+        return node.untried and len(node.children) < allowed
+
+    def _select_child(self, node):
+        log_n = math.log(max(1, node.visits))
+        c = self.exploration
+        return max(node.children,
+                   key=lambda ch: ch.wins / ch.visits + c * math.sqrt(log_n / ch.visits))
+
+    def _playout_stone(self, board_obj, player):
+        frontier = list(board_obj.frontier)
+        if not frontier:
+            return None
+        sample = self.rng.sample(frontier, min(self.playout_sample, len(frontier)))
+        grid = board_obj.grid
+        return max(sample, key=lambda cell: cell_score(grid, cell[0], cell[1], player, 3 - player, self.win_k))
+
+    def _playout(self, board_obj, to_move):
+        """Greedy-random playout; returns the winner, or 0 for no winner."""
+        played = []
+        winner = 0
+        player = to_move
+        for _ in range(self.playout_moves):
+            move = []
+            for _ in range(self.stones_per_move):
+                cell = self._playout_stone(board_obj, player)
+                if cell is None:
+                    break
+                board_obj.apply_move(cell, player)
+                played.append(cell)
+                move.append(cell)
+            if not move:
+                break
+            if board_obj.check_win_at(move, player):
+                winner = player
+                break
+            player = 3 - player
+        for cell in reversed(played):
+            board_obj.undo_move(cell)
+        return winner
+
+    def _iterate(self, root, board_obj):
+        node = root
+        path = []
+        # Selection
+        while node.terminal is None and not self._can_widen(node) and node.children:
+            node = self._select_child(node)
+            board_obj.apply_move(node.move, node.player)
+            path.append(node.move)
+        # Expansion
+        if node.terminal is None:
+            to_move = 3 - node.player
+            if node.untried is None:
+                node.untried = self._moves_for(board_obj, to_move, node.player)
+                if not node.untried:
+                    node.terminal = 0
+            if self._can_widen(node):
+                move = node.untried.pop(0)
+                child = _Node(move, node, to_move)
+                node.children.append(child)
+                board_obj.apply_move(move, to_move)
+                path.append(move)
+                if board_obj.check_win_at(move, to_move):
+                    child.terminal = to_move
+                elif board_obj.check_draw():
+                    child.terminal = 0
+                node = child
+        # Simulation
+        if node.terminal is not None:
+            winner = node.terminal
+        else:
+            winner = self._playout(board_obj, 3 - node.player)
+        for move in reversed(path):
+            board_obj.undo_move(move)
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == 0:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1.0
+            node = node.parent
+
+    def choose_move(self, board_obj, my_player, opp_player):
+        deadline = time.monotonic() + max(0.2, float(self.time_limit_sec))
+        board = board_obj.copy()
+        root = _Node(None, None, opp_player)
+        self.iterations = 0
+        while time.monotonic() < deadline and not self._stop_event.is_set():
+            if self.max_iterations is not None and self.iterations >= self.max_iterations:
+                break
+            self._iterate(root, board)
+            self.iterations += 1
+            if root.untried == [] and not root.children:
+                break
+        if not root.children:
+            return [], None
+        best = max(root.children, key=lambda ch: ch.visits)
+        return list(best.move), best.wins / best.visits
@@ -1,8 +1,12 @@
 # minimax.py
 
+import threading
 import time
 from itertools import combinations
-from heuristics import longest_chain_open
+from candidates import CandidateGenerator, creates_block, stream_moves
+from stats import SearchStats
+from timecontrol import SearchTimeout, next_iteration_cost
+from transposition import make_table, evaluator_tag, EXACT, SIDE_KEY
 
 class Minimax:
     def __init__(self,
@@ -12,7 +16,14 @@ class Minimax:
                  win_k=6,
                  near_radius=2,
                  iterative_deepening=True,
-                 time_limit_sec=2.0):
+                 time_limit_sec=2.0,
+                 tt_buckets=1 << 18,
+                 max_candidates=None,
+                 collect_stats=False,
+                 node_limit=None,
+                 poll_interval=64,
+                 tt_path=None,
+                 board_cls=None):
         self.max_depth = max_depth
         self.heuristic_func = heuristic_func
         self.stones_per_move = stones_per_move
@@ -20,6 +31,73 @@ class Minimax:
         self.near_radius = near_radius
         self.iterative_deepening = iterative_deepening
         self.time_limit_sec = time_limit_sec
+        # tt_path keeps the table in a file shared across moves, games and
+        # processes; the tag keeps other engines' scores apart within it
+        self.tt_path = tt_path
+        # board_cls (e.g. bitboard.BitBoard) to search on instead of the caller's board class
+        self.board_cls = board_cls
+        heuristic_name = evaluator_tag(heuristic_func)
+        self.tt = make_table(tt_buckets, tt_path,
+                             tag=f"{type(self).__name__}:{heuristic_name}:{win_k}:{max_candidates}")
+        # Top-K cell pruning for pair generation; None searches every pair
+        self.candidates = CandidateGenerator(max_candidates, win_k) if max_candidates else None
+        self.threat_cache_size = 1 << 16
+        self._threat_cache = {}
+        # Set by stop() to abort a running search (e.g. a cancelled ponder)
+        self._stop_event = threading.Event()
+        # Search effort of the last choose_move: nodes visited, and
+        # (depth, nodes, seconds) for each completed iterative-deepening depth
+        self.nodes = 0
+        self.depth_log = []
+        # Called as on_iteration(depth, score, nodes, seconds, move) after each
+        # completed depth, e.g. to report progress while the search runs
+        self.on_iteration = None
+        # collect_stats=True leaves a stats.SearchStats for each search in self.stats
+        self.collect_stats = collect_stats
+        self.stats = None
+        # node_limit: stop after that many nodes instead of on the clock, for
+        # reproducible runs. The clock and stop() are checked every poll_interval nodes.
+        self.node_limit = node_limit
+        self.poll_interval = poll_interval
+
+    def stop(self):
+        """Ask a running choose_move to return as soon as possible."""
+        self._stop_event.set()
+
+    def resume(self):
+        """Clear a previous stop() so the next search runs normally."""
+        self._stop_event.clear()
+
+    def _out_of_time(self, deadline):
+        return self._stop_event.is_set() or time.monotonic() >= deadline
+
+    def _poll(self, deadline):
+        """Count a node and abort the search once its node or time budget is used up."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        if self.nodes % self.poll_interval == 0 and self._out_of_time(deadline):
+            raise SearchTimeout()
+
+    def _timed(self, phase, func, *args, **kwargs):
+        if self.stats is None:
+            return func(*args, **kwargs)
+        return self.stats.timed(phase, func, *args, **kwargs)
+
+    def close(self):
+        """Close a file-backed transposition table."""
+        if hasattr(self.tt, "close"):
+            self.tt.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_stop_event'] = None
+        state['on_iteration'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop_event = threading.Event()
 
     def _is_near_stone(self, board_grid, r, c, radius=None):
         if radius is None: radius = self.near_radius
@@ -33,24 +111,49 @@ class Minimax:
 
     def _creates_block(self, board_grid, move, opp_player):
         r, c = move
-        board_grid[r][c] = opp_player
-        length, open_ends = longest_chain_open(board_grid, opp_player)
-        board_grid[r][c] = 0
-        return length >= self.win_k - 1 and open_ends > 0
+        return creates_block(board_grid, r, c, opp_player, self.win_k)
+
+    def _threat_map(self, board_obj, moves, opp_player):
+        """
+        Cells among moves where the opponent would make an open (win_k - 1)-line,
+        cached per position so revisiting a node does not recompute it.
+        """
+        key = (board_obj.hash, opp_player)
+        blocks = self._threat_cache.get(key)
+        if blocks is None:
+            if len(self._threat_cache) >= self.threat_cache_size:
+                self._threat_cache.clear()
+            blocks = {m for m in moves if self._creates_block(board_obj.grid, m, opp_player)}
+            self._threat_cache[key] = blocks
+        return blocks
+
+    def get_moves(self, board_obj, opp_player=None):
+        return self._order_cells(board_obj, self._near_cells(board_obj), opp_player)
 
-    def get_moves(self, board_grid, opp_player=None):
+    def _near_cells(self, board_obj):
+        """Empty cells within near_radius of a stone (every cell on an empty board)."""
+        if board_obj.near_radius == self.near_radius:
+            # The board keeps this set up to date in apply_move/undo_move
+            return board_obj.candidate_cells()
+        board_grid = board_obj.grid
         N = len(board_grid)
         moves = []
-        any_stone = any(board_grid[r][c] != 0 for r in range(N) for c in range(N))
+        any_stone = board_obj.stone_count > 0
         for r in range(N):
             for c in range(N):
                 if board_grid[r][c] == 0:
                     if not any_stone or self._is_near_stone(board_grid, r, c):
                         moves.append((r, c))
+        return moves
+
+    def _order_cells(self, board_obj, moves, opp_player=None):
+        """Sort cells in place: blocks of the opponent's open lines first, then by centre distance."""
+        N = board_obj.size
         center_r, center_c = N // 2, N // 2
         if opp_player is not None:
+            blocks = self._threat_map(board_obj, moves, opp_player)
             moves.sort(key=lambda m: (
-                0 if self._creates_block(board_grid, m, opp_player) else 1,
+                0 if m in blocks else 1,
                 abs(m[0]-center_r) + abs(m[1]-center_c)
             ))
         else:
@@ -58,57 +161,176 @@ class Minimax:
         return moves
 
     def evaluate_terminal(self, board_obj, my_player, opp_player, depth):
-        if board_obj.check_win(my_player): return float('inf') - depth
-        if board_obj.check_win(opp_player): return float('-inf') + depth
-        moves = self.get_moves(board_obj.grid, opp_player)
-        if depth >= self.max_depth or not moves:
-            return self.heuristic_func(board_obj.grid, my_player, opp_player,
-                                       win_k=self.win_k, depth=depth)
+        winner = self._timed("terminal", board_obj.last_winner)
+        if winner == my_player: return float('inf') - depth
+        if winner == opp_player: return float('-inf') + depth
+        if depth >= self.max_depth or self._timed("terminal", board_obj.check_draw):
+            return self._timed("evaluation", self.heuristic_func, board_obj.grid, my_player, opp_player,
+                               win_k=self.win_k, depth=depth)
         return None
 
+    def _move_combinations(self, board_obj, mover, other, opp_player):
+        """
+        All k-stone moves, or the candidate generator's pruned and ordered
+        list, as Board.encode_move codes.
+        """
+        if self.candidates is None:
+            moves = self.get_moves(board_obj, opp_player)
+            k = min(self.stones_per_move, len(moves))
+            combos = combinations(moves, k) if k > 0 else ()
+        else:
+            moves = self.get_moves(board_obj)
+            k = min(self.stones_per_move, len(moves))
+            combos = self.candidates.combos(board_obj.grid, moves, k, mover, other)
+        encode = board_obj.encode_move
+        return [encode(combo) for combo in combos]
+
+    def _move_stream(self, board_obj, opp_player, tt_move):
+        """The moves of this node as a lazy stream, the TT move first, then pairs best first by cell order."""
+        moves = self._timed("movegen", self._near_cells, board_obj)
+        moves = self._timed("ordering", self._order_cells, board_obj, moves, opp_player)
+        k = min(self.stones_per_move, len(moves))
+        if k <= 0:
+            return iter(())
+        stream = stream_moves(moves, k, board_obj.size, (tt_move,))
+        # Pairs are made as the search takes them, so that is where movegen time goes
+        return stream if self.stats is None else self.stats.timed_iter("movegen", stream)
+
+    def _order_tt_move(self, move_combinations, tt_move):
+        """Move the transposition-table best move to the front, if present."""
+        if tt_move is not None and tt_move in move_combinations:
+            move_combinations.remove(tt_move)
+            move_combinations.insert(0, tt_move)
+        return move_combinations
+
     def minimax(self, board_obj, depth, is_maximizing, my_player, opp_player, deadline):
-        if time.time() >= deadline:
-            return [], self.heuristic_func(board_obj.grid, my_player, opp_player,
-                                           win_k=self.win_k, depth=depth)
+        self._poll(deadline)
+        remaining = self.max_depth - depth
+        key = board_obj.hash if is_maximizing else board_obj.hash ^ SIDE_KEY
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(key)
+            if self.stats is not None:
+                self.stats.tt_probes += 1
+                self.stats.tt_hits += entry is not None
+            if entry is not None:
+                _, tt_depth, _, tt_score, tt_move, _ = entry
+                # Minimax never narrows a window, so every stored score is exact
+                if depth > 0 and tt_depth >= remaining:
+                    return tt_move, tt_score
         term = self.evaluate_terminal(board_obj, my_player, opp_player, depth)
         if term is not None:
-            return [], term
-        moves = self.get_moves(board_obj.grid, opp_player)
-        k = min(self.stones_per_move, len(moves))
-        move_combinations = list(combinations(moves, k)) if k > 0 else []
+            if self.tt is not None:
+                self.tt.store(key, remaining, EXACT, term, None)
+            return None, term
+        mover, other = (my_player, opp_player) if is_maximizing else (opp_player, my_player)
+        if self.candidates is None:
+            # Full width: a lazy stream instead of every pair built up front
+            move_combinations = self._move_stream(board_obj, opp_player, tt_move)
+        else:
+            move_combinations = self._timed("movegen", self._move_combinations, board_obj, mover, other, opp_player)
+            move_combinations = self._timed("ordering", self._order_tt_move, move_combinations, tt_move)
         if is_maximizing:
             best_score = float('-inf')
-            best_move = []
+            best_move = None
             for combo in move_combinations:
-                if time.time() >= deadline: break
-                board_obj.apply_move(combo, my_player)
+                board_obj.apply_pair(combo, my_player)
                 _, score = self.minimax(board_obj, depth+1, False, my_player, opp_player, deadline)
-                board_obj.undo_move(combo)
+                board_obj.undo_pair(combo)
                 if score is not None and score > best_score:
-                    best_score, best_move = score, list(combo)
-            return best_move, best_score
+                    best_score, best_move = score, combo
         else:
             best_score = float('inf')
-            best_move = []
+            best_move = None
             for combo in move_combinations:
-                if time.time() >= deadline: break
-                board_obj.apply_move(combo, opp_player)
+                board_obj.apply_pair(combo, opp_player)
                 _, score = self.minimax(board_obj, depth+1, True, my_player, opp_player, deadline)
-                board_obj.undo_move(combo)
+                board_obj.undo_pair(combo)
                 if score is not None and score < best_score:
-                    best_score, best_move = score, list(combo)
-            return best_move, best_score
+                    best_score, best_move = score, combo
+        if self.tt is not None and best_move is not None:
+            self.tt.store(key, remaining, EXACT, best_score, best_move)
+        return best_move, best_score
+
+    def _search_board(self, board_obj):
+        """Private copy of the board, with an incremental heuristic attached if it has one."""
+        if self.board_cls is None or type(board_obj) is self.board_cls:
+            root = board_obj.copy()
+        else:
+            root = self.board_cls.from_board(board_obj)
+        set_size = getattr(self.tt, "set_size", None)
+        if set_size is not None:
+            set_size(root.size)
+        attach = getattr(self.heuristic_func, "attach", None)
+        if attach is not None:
+            attach(root)
+        return root
+
+    def _fallback_move(self, board_obj, my_player, opp_player):
+        """Best-ordered move, for when the budget runs out before depth 1 is searched."""
+        combos = self._move_combinations(board_obj, my_player, opp_player, opp_player)
+        return (combos[0], None) if combos else (None, None)
+
+    def _next_depth_fits(self, iterations, deadline):
+        """Whether the next depth is predicted to finish within the node or time budget."""
+        cost = next_iteration_cost(iterations)
+        if cost is None:
+            return True
+        if self.node_limit is not None:
+            return self.nodes + cost[0] <= self.node_limit
+        return time.monotonic() + cost[1] <= deadline
 
     def choose_move(self, board_obj, my_player, opp_player):
-        deadline = time.time() + max(0.2, float(self.time_limit_sec))
-        best_move, best_score = [], None
+        self.stats = SearchStats() if self.collect_stats else None
+        move, score = self._choose_move(board_obj, my_player, opp_player)
+        if self.stats is not None:
+            self.stats.finish(self.nodes)
+        # Moves are int codes inside the search and (r, c) stones outside it
+        return (list(board_obj.decode_move(move)) if move is not None else []), score
+
+    def _choose_move(self, board_obj, my_player, opp_player):
+        start = time.monotonic()
+        # A node limit replaces the clock so that runs repeat exactly
+        if self.node_limit is not None:
+            deadline = float('inf')
+        else:
+            deadline = start + max(0.2, float(self.time_limit_sec))
+        self.nodes = 0
+        self.depth_log = []
+        best_move, best_score = None, None
+        if self.tt is not None:
+            self.tt.new_search()
+        root = self._search_board(board_obj)
         if not self.iterative_deepening:
-            return self.minimax(board_obj.copy(), 0, True, my_player, opp_player, deadline)
+            try:
+                return self.minimax(root, 0, True, my_player, opp_player, deadline)
+            except SearchTimeout:
+                return self._fallback_move(board_obj, my_player, opp_player)
         original_max = self.max_depth
-        for d in range(1, original_max+1):
-            if time.time() >= deadline: break
-            self.max_depth = d
-            move, score = self.minimax(board_obj.copy(), 0, True, my_player, opp_player, deadline)
-            if move: best_move, best_score = move, score
-        self.max_depth = original_max
-        return best_move, best_score
\ No newline at end of file
+        iterations = []  # (nodes, seconds) of each completed depth
+        try:
+            for d in range(1, original_max+1):
+                if self._out_of_time(deadline) or not self._next_depth_fits(iterations, deadline):
+                    break
+                self.max_depth = d
+                iter_start, iter_nodes = time.monotonic(), self.nodes
+                try:
+                    move, score = self.minimax(root, 0, True, my_player, opp_player, deadline)
+                except SearchTimeout:
+                    # An unfinished depth is thrown away; the last completed one stands
+                    if self.stats is not None:
+                        self.stats.end_iteration(d, self.nodes, False)
+                    break
+                if move is not None: best_move, best_score = move, score
+                now = time.monotonic()
+                iterations.append((self.nodes - iter_nodes, now - iter_start))
+                self.depth_log.append((d, self.nodes, now - start))
+                if self.on_iteration is not None and best_move is not None:
+                    self.on_iteration(d, best_score, self.nodes, now - start, list(board_obj.decode_move(best_move)))
+                if self.stats is not None:
+                    self.stats.end_iteration(d, self.nodes, True)
+        finally:
+            self.max_depth = original_max
+        if best_move is None:
+            return self._fallback_move(board_obj, my_player, opp_player)
+        return best_move, best_score
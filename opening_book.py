@@ -0,0 +1,235 @@
+# opening_book.py
+
+import mmap
+import os
+import random
+import struct
+
+from board import Board
+
+# One book entry: position key, move (r1, c1, r2, c2; r2 = c2 = -1 for a
+# single stone) in the canonical frame, and how often it was recorded
+RECORD = struct.Struct("<QhhhhI")
+
+_MASK = (1 << 64) - 1
+_TRANSLATED = 0x9E3779B97F4A7C15  # keeps translated and absolute keys apart
+
+
+def splitmix64(x):
+    """Well-mixed 64-bit value for x (the SplitMix64 finalizer)."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+def stone_key(r, c, player):
+    """Zobrist key of one stone; coordinates may be negative in a translated frame."""
+    return splitmix64(((r & 0xFFFF) << 24) | ((c & 0xFFFF) << 8) | player)
+
+
+# The 8 symmetries of the square, as (r, c) -> (r', c') on an N x N board
+SYMMETRIES = [
+    lambda r, c, n: (r, c),
+    lambda r, c, n: (c, n - 1 - r),
+    lambda r, c, n: (n - 1 - r, n - 1 - c),
+    lambda r, c, n: (n - 1 - c, r),
+    lambda r, c, n: (r, n - 1 - c),
+    lambda r, c, n: (n - 1 - r, c),
+    lambda r, c, n: (c, r),
+    lambda r, c, n: (n - 1 - c, n - 1 - r),
+]
+# INVERSE[t] undoes SYMMETRIES[t] (the two quarter turns swap, the rest are involutions)
+INVERSE = [0, 3, 2, 1, 4, 5, 6, 7]
+
+
+class Frame:
+    """
+    How a board maps onto its canonical form: a symmetry followed by a shift.
+    to_canonical/from_canonical convert move cells between the two.
+    """
+
+    def __init__(self, size, symmetry, dr, dc):
+        self.size = size
+        self.symmetry = symmetry
+        self.dr = dr
+        self.dc = dc
+
+    def to_canonical(self, r, c):
+        r, c = SYMMETRIES[self.symmetry](r, c, self.size)
+        return r - self.dr, c - self.dc
+
+    def from_canonical(self, r, c):
+        return SYMMETRIES[INVERSE[self.symmetry]](r + self.dr, c + self.dc, self.size)
+
+
+def canonical_key(board_obj, margin=None):
+    """
+    (key, frame) for the position: the smallest Zobrist hash over the 8
+    board symmetries. When every stone is at least margin cells (default
+    win_k) from the edge, the edges cannot matter yet, so the stones are
+    also shifted to start at (0, 0) and the key ignores where on the board
+    the shape sits. Board size and win_k are mixed in, so one book file
+    never answers for a different board or rule.
+    """
+    size = board_obj.size
+    if margin is None:
+        margin = board_obj.win_k
+    stones = board_obj.stones()
+    translate = bool(stones) and all(
+        margin <= r < size - margin and margin <= c < size - margin for r, c, _ in stones)
+    game = splitmix64((size << 8) | board_obj.win_k)
+    best = None
+    for t, sym in enumerate(SYMMETRIES):
+        moved = [(sym(r, c, size), v) for r, c, v in stones]
+        dr = min(r for (r, _), _ in moved) if translate else 0
+        dc = min(c for (_, c), _ in moved) if translate else 0
+        key = game ^ _TRANSLATED if translate else game
+        for (r, c), v in moved:
+            key ^= stone_key(r - dr, c - dc, v)
+        if best is None or key < best[0]:
+            best = (key, Frame(size, t, dr, dc))
+    return best
+
+
+class OpeningBook:
+    """
+    Read-only opening book: a file of RECORD entries sorted by key, memory
+    mapped and binary searched, so opening it costs nothing up front and
+    lookups touch a handful of pages.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.count = size // RECORD.size
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, i):
+        return RECORD.unpack_from(self._map, i * RECORD.size)[0]
+
+    def entries(self, key):
+        """All (move, weight) records for a key, move in the canonical frame."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < self.count:
+            k, r1, c1, r2, c2, weight = RECORD.unpack_from(self._map, lo * RECORD.size)
+            if k != key:
+                break
+            move = [(r1, c1)] if r2 == -1 and c2 == -1 else [(r1, c1), (r2, c2)]
+            found.append((move, weight))
+            lo += 1
+        return found
+
+    def lookup(self, board_obj):
+        """The most played book move for this position, in board coordinates, or None."""
+        key, frame = canonical_key(board_obj)
+        N = board_obj.size
+        for move, _ in sorted(self.entries(key), key=lambda e: -e[1]):
+            cells = [frame.from_canonical(r, c) for r, c in move]
+            if all(0 <= r < N and 0 <= c < N and board_obj.grid[r][c] == Board.EMPTY for r, c in cells) \
+                    and len(set(cells)) == len(cells):
+                return cells
+        return None
+
+
+class BookBuilder:
+    """Collects (position, move) pairs and writes them out as a sorted book file."""
+
+    def __init__(self):
+        self.moves = {}  # key -> {canonical move: weight}
+
+    def add(self, board_obj, move, weight=1):
+        key, frame = canonical_key(board_obj)
+        cells = tuple(frame.to_canonical(r, c) for r, c in Board.normalize_move(move))
+        # Stone order within a move is irrelevant, so store it sorted
+        cells = tuple(sorted(cells))
+        entry = self.moves.setdefault(key, {})
+        entry[cells] = entry.get(cells, 0) + weight
+
+    def merge(self, book):
+        """Keep the records of an existing OpeningBook."""
+        for i in range(book.count):
+            key, r1, c1, r2, c2, weight = RECORD.unpack_from(book._map, i * RECORD.size)
+            cells = ((r1, c1),) if r2 == -1 and c2 == -1 else ((r1, c1), (r2, c2))
+            entry = self.moves.setdefault(key, {})
+            entry[cells] = entry.get(cells, 0) + weight
+
+    def save(self, path):
+        records = []
+        for key, entry in self.moves.items():
+            for cells, weight in entry.items():
+                (r1, c1), (r2, c2) = cells if len(cells) == 2 else (cells[0], (-1, -1))
+                records.append((key, r1, c1, r2, c2, min(weight, 0xFFFFFFFF)))
+        records.sort()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write(RECORD.pack(*record))
+        os.replace(tmp, path)
+        return len(records)
+
+    def self_play(self, engine, games=10, plies=6, size=19, win_k=6, seed=None):
+        """
+        Play engine against itself for the first plies moves of each game and
+        record every move it chose. The first stone is placed at random near
+        the centre so the games differ; it is not recorded.
+        """
+        rng = random.Random(seed)
+        for _ in range(games):
+            board = Board(size, win_k)
+            center = size // 2
+            spread = max(1, size // 8)
+            first = (center + rng.randint(-spread, spread), center + rng.randint(-spread, spread))
+            board.apply_move([first], 1)
+            player = 2
+            for _ in range(plies):
+                move, _ = engine.choose_move(board, player, 3 - player)
+                if not move:
+                    break
+                self.add(board, move)
+                board.apply_move(move, player)
+                if board.check_win_at(move, player):
+                    break
+                player = 3 - player
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from alphabeta import AlphaBeta
+    from patterns import PatternHeuristic
+
+    parser = argparse.ArgumentParser(description="Build an opening book from deep self-play searches.")
+    parser.add_argument("path")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--plies", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--time", type=float, default=30.0)
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    builder = BookBuilder()
+    if os.path.exists(args.path):
+        book = OpeningBook(args.path)
+        builder.merge(book)
+        book.close()
+    engine = AlphaBeta(args.depth, PatternHeuristic(), time_limit_sec=args.time, max_candidates=12)
+    builder.self_play(engine, args.games, args.plies, args.size, seed=args.seed)
+    print(f"{builder.save(args.path)} records written to {args.path}")
@@ -0,0 +1,205 @@
+# patterns.py
+
+from board import Board
+
+_LAYOUTS = {}
+
+
+def window_layout(size, win_k):
+    """
+    Every length-win_k segment on the board, in the four line directions.
+    Returns (windows, cell_windows): windows[w] is the list of flat cell
+    indices r * size + c in window w, and cell_windows[i] lists the windows
+    that contain cell i. Shared by every table of one (size, win_k).
+    """
+    key = (size, win_k)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        windows = []
+        cell_windows = [[] for _ in range(size * size)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(size):
+                for c in range(size):
+                    end_r = r + (win_k - 1) * dr
+                    end_c = c + (win_k - 1) * dc
+                    if not (0 <= end_r < size and 0 <= end_c < size):
+                        continue
+                    cells = [(r + i * dr) * size + (c + i * dc) for i in range(win_k)]
+                    for cell in cells:
+                        cell_windows[cell].append(len(windows))
+                    windows.append(cells)
+        layout = (windows, cell_windows)
+        _LAYOUTS[key] = layout
+    return layout
+
+
+class PatternTable:
+    """
+    Incrementally maintained evaluation state for one Board.
+
+    For every window it keeps how many stones each player has in it. A window
+    is "live" for a player when the opponent has no stone in it, and
+    live[player][n] counts the player's live windows holding n stones.
+    Alongside that it tracks the inputs of heuristic2: mobility (empty cells
+    next to the player's stones) and center control.
+
+    Registered as a Board listener, so every apply_move/undo_move only touches
+    the windows through the changed cells.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.size = board.size
+        self.win_k = board.win_k
+        self.windows, self.cell_windows = window_layout(self.size, self.win_k)
+        n_windows = len(self.windows)
+        self.counts = {1: [0] * n_windows, 2: [0] * n_windows}
+        self.live = {1: [0] * (self.win_k + 1), 2: [0] * (self.win_k + 1)}
+        self.adjacent = {1: [0] * (self.size * self.size), 2: [0] * (self.size * self.size)}
+        self.mobility = {1: 0, 2: 0}
+        self.center = {1: 0, 2: 0}
+        self.mid = (self.size - 1) // 2
+        self._build()
+        board.add_listener(self)
+
+    def _build(self):
+        N = self.size
+        grid = self.board.grid
+        for r in range(N):
+            for c in range(N):
+                player = grid[r][c]
+                if player not in (1, 2):
+                    continue
+                self._update_windows(r, c, player, 1)
+                self.center[player] -= abs(r - self.mid) + abs(c - self.mid)
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        nr, nc = r + dr, c + dc
+                        if (dr or dc) and 0 <= nr < N and 0 <= nc < N:
+                            self.adjacent[player][nr * N + nc] += 1
+        for p in (1, 2):
+            self.mobility[p] = sum(1 for r in range(N) for c in range(N)
+                                   if grid[r][c] == 0 and self.adjacent[p][r * N + c] > 0)
+
+    def detach(self):
+        self.board.remove_listener(self)
+
+    def on_place(self, r, c, player):
+        self._update(r, c, player, 1)
+
+    def on_remove(self, r, c, player):
+        self._update(r, c, player, -1)
+
+    def _update(self, r, c, player, delta):
+        self._update_windows(r, c, player, delta)
+        self.center[player] -= delta * (abs(r - self.mid) + abs(c - self.mid))
+        self._update_mobility(r, c, player, delta)
+
+    def _update_windows(self, r, c, player, delta):
+        opp = 3 - player
+        mine, theirs = self.counts[player], self.counts[opp]
+        live_mine, live_theirs = self.live[player], self.live[opp]
+        for w in self.cell_windows[r * self.size + c]:
+            a, b = mine[w], theirs[w]
+            # drop this window's old contribution
+            if b == 0 and a > 0:
+                live_mine[a] -= 1
+            elif a == 0 and b > 0:
+                live_theirs[b] -= 1
+            a += delta
+            mine[w] = a
+            if b == 0 and a > 0:
+                live_mine[a] += 1
+            elif a == 0 and b > 0:
+                live_theirs[b] += 1
+
+    def _update_mobility(self, r, c, player, delta):
+        N = self.size
+        grid = self.board.grid
+        idx = r * N + c
+        adjacent = self.adjacent[player]
+        # The changed cell itself leaves (or rejoins) the empty cells
+        for p in (1, 2):
+            if self.adjacent[p][idx] > 0:
+                self.mobility[p] -= delta
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if dr == 0 and dc == 0:
+                    continue
+                nr, nc = r + dr, c + dc
+                if not (0 <= nr < N and 0 <= nc < N):
+                    continue
+                n_idx = nr * N + nc
+                before = adjacent[n_idx]
+                adjacent[n_idx] = before + delta
+                if grid[nr][nc] == 0 and (before == 0) != (before + delta == 0):
+                    self.mobility[player] += delta
+
+    def chain(self, player):
+        """
+        Window counterpart of heuristics.longest_chain_open: the most stones
+        the player has in a live window, and how many such windows (capped
+        at 2, like open ends).
+        """
+        live = self.live[player]
+        for n in range(self.win_k, 0, -1):
+            if live[n]:
+                return n, min(2, live[n])
+        return 0, 0
+
+    def threat(self, player):
+        length, open_ends = self.chain(player)
+        return length * open_ends
+
+
+class PatternHeuristic:
+    """
+    Drop-in replacement for heuristic1/heuristic2 backed by a PatternTable.
+
+    Engines call attach(board_obj) on the board they search, after which each
+    evaluation reads the table in O(win_k) instead of scanning the grid.
+    Called with a grid it is not attached to, it builds a throwaway table.
+    Use one instance per engine.
+    """
+
+    def __init__(self, kind="heuristic2", A=2, B=3, C=1):
+        self.kind = kind
+        self.A, self.B, self.C = A, B, C
+        self.table = None
+
+    def cache_tag(self):
+        """Identifies the scores this instance gives, for transposition-table tags."""
+        return f"pattern:{self.kind}:{self.A},{self.B},{self.C}"
+
+    def attach(self, board_obj):
+        if self.table is not None:
+            self.table.detach()
+        self.table = PatternTable(board_obj)
+
+    def _table_for(self, board_grid, win_k):
+        if self.table is not None and self.table.board.grid is board_grid:
+            return self.table
+        board = Board(size=len(board_grid), win_k=win_k)
+        board.grid = board_grid
+        return PatternTable(board)
+
+    def __call__(self, board_grid, my_player, opp_player, win_k=6, depth=None):
+        table = self._table_for(board_grid, win_k)
+        my_len, my_open = table.chain(my_player)
+        opp_len, opp_open = table.chain(opp_player)
+
+        if self.kind == "heuristic1":
+            h = my_len * my_open - opp_len * opp_open
+        else:
+            my_threat, opp_threat = my_len * my_open, opp_len * opp_open
+            h = (self.A * (table.mobility[my_player] - table.mobility[opp_player])
+               + self.B * (my_threat - opp_threat)
+               + self.C * (table.center[my_player] - table.center[opp_player]))
+            if depth is not None and depth >= 3:
+                h += 2 * (my_threat - opp_threat)
+
+        if opp_len >= win_k - 1 and opp_open > 0:
+            h -= 5000
+        if my_len >= win_k - 1 and my_open > 0:
+            h += 5000
+        return h
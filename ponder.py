@@ -0,0 +1,96 @@
+# ponder.py
+
+import threading
+
+from candidates import CandidateGenerator
+
+
+class Ponderer:
+    """
+    Wraps a search engine so it can think during the opponent's turn.
+
+    ponder() guesses the opponent's reply (the engine's principal variation if
+    it has one, otherwise the best-scored candidate pair), plays it on a copy
+    of the board and searches our answer on a background thread. When
+    choose_move() is then called on the real position:
+      - ponder hit: the position matches the guess, so the background search
+        is reused (waited for if it is still running);
+      - ponder miss: the background search is stopped and a normal search runs,
+        still benefiting from whatever it left in the transposition table.
+
+    Anything else (max_depth, time_limit_sec, pv, ...) is forwarded to the
+    wrapped engine, so it can stand in for it inside AI_Player.
+    """
+
+    def __init__(self, engine, top_k=8, stones_per_move=2):
+        self.engine = engine
+        self.top_k = top_k
+        self.stones_per_move = stones_per_move
+        self._thread = None
+        self._ponder_hash = None
+        self._result = None
+
+    def __getattr__(self, name):
+        if name == "engine":
+            raise AttributeError(name)
+        return getattr(self.engine, name)
+
+    def predict_reply(self, board_obj, my_player, opp_player):
+        """Best guess at the opponent's next move, or None."""
+        # The engine keeps its principal variation as Board.encode_move codes
+        pv = getattr(self.engine, "pv", None)
+        if pv and len(pv) > 1 and board_obj.history and \
+                set(board_obj.history[-1][0]) == set(board_obj.decode_move(pv[0])):
+            return board_obj.decode_move(pv[1])
+        moves = board_obj.candidate_cells()
+        k = min(self.stones_per_move, len(moves))
+        combos = CandidateGenerator(self.top_k, board_obj.win_k).combos(
+            board_obj.grid, moves, k, opp_player, my_player)
+        return combos[0] if combos else None
+
+    def ponder(self, board_obj, my_player, opp_player):
+        """Start searching our reply to the predicted opponent move."""
+        self.stop()
+        reply = self.predict_reply(board_obj, my_player, opp_player)
+        if not reply:
+            return
+        board = board_obj.copy()
+        try:
+            board.apply_move(reply, opp_player)
+        except ValueError:
+            return
+        if board.last_winner() is not None or board.check_draw():
+            return
+        self._ponder_hash = board.hash
+        self._result = None
+
+        def run():
+            self._result = self.engine.choose_move(board, my_player, opp_player)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def is_pondering(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """Cancel any background search and wait for it to exit."""
+        if self._thread is not None:
+            self.engine.stop()
+            self._thread.join()
+            self.engine.resume()
+        self._thread = None
+        self._ponder_hash = None
+        self._result = None
+
+    def choose_move(self, board_obj, my_player, opp_player):
+        if self._thread is not None and board_obj.hash == self._ponder_hash:
+            # Ponder hit: the search already has a head start on this position
+            self._thread.join()
+            result = self._result
+            self._thread = None
+            self._ponder_hash = None
+            if result and result[0]:
+                return result
+        self.stop()
+        return self.engine.choose_move(board_obj, my_player, opp_player)
@@ -0,0 +1,176 @@
+# sparse_board.py
+
+from board import Board
+from opening_book import stone_key
+
+
+class _Row(dict):
+    """One row of a SparseGrid: column -> stone, reading 0 where there is none."""
+
+    def __missing__(self, c):
+        return Board.EMPTY
+
+
+class SparseGrid:
+    """
+    Stands in for Board.grid on a SparseBoard. grid[r][c] and len(grid) work
+    as on the dense list of lists, but only stones are stored; stones maps
+    (r, c) -> player for code that would otherwise scan every cell.
+    Iterating it builds dense rows, so keep that to printing and the like.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.stones = {}
+        self.rows = {}
+        self._empty_row = _Row()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, r):
+        return self.rows.get(r, self._empty_row)
+
+    def __iter__(self):
+        for r in range(self.size):
+            row = self.rows.get(r, self._empty_row)
+            yield [row[c] for c in range(self.size)]
+
+    def put(self, r, c, player):
+        self.stones[(r, c)] = player
+        row = self.rows.get(r)
+        if row is None:
+            row = self.rows[r] = _Row()
+        row[c] = player
+
+    def clear(self, r, c):
+        del self.stones[(r, c)]
+        row = self.rows[r]
+        del row[c]
+        if not row:
+            del self.rows[r]
+
+    def copy(self):
+        new_grid = SparseGrid(self.size)
+        new_grid.stones = dict(self.stones)
+        new_grid.rows = {r: _Row(row) for r, row in self.rows.items()}
+        return new_grid
+
+
+class _CellIndex:
+    """Board.coords without the table: cell index -> (r, c)."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __getitem__(self, i):
+        return divmod(i, self.size)
+
+
+class SparseBoard(Board):
+    """
+    Board whose memory and per-move work depend on the stones played, not
+    on size * size, for very large boards (59x59 and up).
+
+    Stones live in a SparseGrid, stone counts near each cell in a dict and
+    Zobrist keys are computed per stone, so nothing is allocated per cell.
+    check_win and candidate_cells only visit stones and the cells next to
+    them, and the heuristics, candidate generator and threat solver read
+    grid.stones instead of scanning the board. On an empty board the only
+    candidate is the centre. Hashes differ from a dense Board's.
+    """
+
+    def __init__(self, size=19, win_k=6, near_radius=2):
+        self.size = size
+        self.win_k = win_k
+        self.near_radius = near_radius
+        self.grid = SparseGrid(size)
+        self.stone_count = 0
+        self.history = []
+        self.hash = 0
+        self.listeners = []
+        self.area = size * size
+        self.coords = _CellIndex(size)
+        self.near_counts = {}  # (r, c) -> stones within near_radius, for cells with any
+        self.frontier = set()
+
+    def _place(self, r, c, player):
+        self.grid.put(r, c, player)
+        self.stone_count += 1
+        self.hash ^= stone_key(r, c, player)
+        self.frontier.discard((r, c))
+        near_counts, stones, rad = self.near_counts, self.grid.stones, self.near_radius
+        for nr in range(max(0, r - rad), min(self.size - 1, r + rad) + 1):
+            for nc in range(max(0, c - rad), min(self.size - 1, c + rad) + 1):
+                cell = (nr, nc)
+                count = near_counts.get(cell, 0) + 1
+                near_counts[cell] = count
+                if count == 1 and cell not in stones:
+                    self.frontier.add(cell)
+        for listener in self.listeners:
+            listener.on_place(r, c, player)
+
+    def _remove(self, r, c):
+        player = self.grid.stones[(r, c)]
+        self.hash ^= stone_key(r, c, player)
+        self.grid.clear(r, c)
+        self.stone_count -= 1
+        near_counts, rad = self.near_counts, self.near_radius
+        for nr in range(max(0, r - rad), min(self.size - 1, r + rad) + 1):
+            for nc in range(max(0, c - rad), min(self.size - 1, c + rad) + 1):
+                cell = (nr, nc)
+                count = near_counts[cell] - 1
+                if count:
+                    near_counts[cell] = count
+                else:
+                    del near_counts[cell]
+                    self.frontier.discard(cell)
+        if (r, c) in near_counts:
+            self.frontier.add((r, c))
+        for listener in self.listeners:
+            listener.on_remove(r, c, player)
+
+    def candidate_cells(self):
+        if self.stone_count == 0:
+            return [(self.size // 2, self.size // 2)]
+        return sorted(self.frontier)
+
+    def stones(self):
+        return sorted((r, c, v) for (r, c), v in self.grid.stones.items())
+
+    def check_win(self, player):
+        """Check for a line of win_k, starting only from the first stone of each run."""
+        stones = self.grid.stones
+        for (r, c), v in stones.items():
+            if v != player:
+                continue
+            for dr, dc in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                if stones.get((r - dr, c - dc)) == player:
+                    continue
+                count = 1
+                while stones.get((r + count * dr, c + count * dc)) == player:
+                    count += 1
+                if count >= self.win_k:
+                    return True
+        return False
+
+    def reset(self):
+        if self.listeners:
+            for r, c, _ in self.stones():
+                self._remove(r, c)
+        self.grid = SparseGrid(self.size)
+        self.stone_count = 0
+        self.history = []
+        self.hash = 0
+        self.near_counts = {}
+        self.frontier = set()
+
+    def copy(self):
+        new_board = type(self)(size=self.size, win_k=self.win_k, near_radius=self.near_radius)
+        new_board.grid = self.grid.copy()
+        new_board.stone_count = self.stone_count
+        new_board.hash = self.hash
+        new_board.near_counts = dict(self.near_counts)
+        new_board.frontier = set(self.frontier)
+        new_board.history = [(list(stones), player) for stones, player in self.history]
+        return new_board
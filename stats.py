@@ -0,0 +1,99 @@
+# stats.py
+
+import time
+
+_DONE = object()
+
+
+class SearchStats:
+    """
+    What one choose_move call spent its time on.
+
+    Engines built with collect_stats=True fill one of these per search and
+    leave it in engine.stats. Time is split into move generation, move
+    ordering, heuristic evaluation and terminal checks (win/draw tests);
+    depths lists (depth, nodes, cutoffs, seconds, completed) for every
+    iterative-deepening iteration, with nodes and cutoffs counted within
+    that iteration. Parallel root workers are not included.
+    """
+
+    PHASES = ("movegen", "ordering", "evaluation", "terminal")
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.threat_nodes = 0  # nodes of a threat-space search run before the main search
+        self.phase_time = dict.fromkeys(self.PHASES, 0.0)
+        self.depths = []
+        self.completed_depth = 0
+        self.elapsed = 0.0
+        self._start = time.perf_counter()
+        self._mark = (0, 0, self._start)
+
+    def timed(self, phase, func, *args, **kwargs):
+        """Call func and charge its run time to phase."""
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.phase_time[phase] += time.perf_counter() - start
+        return result
+
+    def timed_iter(self, phase, iterator):
+        """Yield the items of iterator, charging the time of each step to phase."""
+        phase_time = self.phase_time
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _DONE)
+            phase_time[phase] += time.perf_counter() - start
+            if item is _DONE:
+                return
+            yield item
+
+    def end_iteration(self, depth, nodes, completed):
+        """Close an iterative-deepening iteration; nodes is the engine's running total."""
+        now = time.perf_counter()
+        last_nodes, last_cutoffs, last_time = self._mark
+        self.depths.append((depth, nodes - last_nodes, self.cutoffs - last_cutoffs, now - last_time, completed))
+        self._mark = (nodes, self.cutoffs, now)
+        if completed:
+            self.completed_depth = depth
+
+    def finish(self, nodes):
+        self.nodes = nodes
+        self.elapsed = time.perf_counter() - self._start
+
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else None
+
+    def nodes_per_sec(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "completed_depth": self.completed_depth,
+            "elapsed": self.elapsed,
+            "nodes_per_sec": self.nodes_per_sec(),
+            "tt_hit_rate": self.tt_hit_rate(),
+            "threat_nodes": self.threat_nodes,
+            "phase_time": dict(self.phase_time),
+            "depths": [dict(zip(("depth", "nodes", "cutoffs", "seconds", "completed"), d)) for d in self.depths],
+        }
+
+    def summary(self):
+        """One line for a status bar."""
+        parts = [f"depth {self.completed_depth}",
+                 f"{self.nodes} nodes",
+                 f"{self.nodes_per_sec():.0f} n/s",
+                 f"{self.cutoffs} cutoffs"]
+        if self.threat_nodes:
+            parts.append(f"{self.threat_nodes} threat-search nodes")
+        rate = self.tt_hit_rate()
+        if rate is not None:
+            parts.append(f"TT {rate:.0%}")
+        spent = sum(self.phase_time.values())
+        if spent > 0:
+            parts.append(" ".join(f"{phase} {t / spent:.0%}" for phase, t in self.phase_time.items()))
+        return ", ".join(parts)
@@ -0,0 +1,238 @@
+# threats.py
+
+import time
+from itertools import combinations
+
+from board import stones_of
+from patterns import window_layout
+
+
+def _line_windows(size, win_k, r, c):
+    """(key, cells) of every window through (r, c), worked out without a layout table."""
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for back in range(win_k):
+            sr, sc = r - back * dr, c - back * dc
+            er, ec = sr + (win_k - 1) * dr, sc + (win_k - 1) * dc
+            if 0 <= sr < size and 0 <= sc < size and 0 <= er < size and 0 <= ec < size:
+                yield (sr, sc, dr, dc), [(sr + i * dr, sc + i * dc) for i in range(win_k)]
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class ThreatSolver:
+    """
+    Threat-space search for forced wins (the Connect6 form of VCF).
+
+    A threat is a window of win_k cells holding at least win_k - 2 of the
+    attacker's stones and none of the defender's, so the attacker finishes it
+    with the next two stones. The attacker only plays double threats: pairs
+    after which no single defending stone covers every threat, so both
+    defending stones are forced and the defender's replies are exactly the
+    pairs that cover them all. A move leaving threats that no pair covers
+    wins outright.
+
+    Attacking pairs are drawn from windows the pair can turn into threats
+    (ranked, at most max_moves per node); defences are never pruned, so a
+    win reported by solve() is a proven one. A defence that creates a threat
+    of the defender's own must be answered by the attacker's next pair.
+    The search gives up after max_depth attacking moves or node_budget nodes,
+    or once its deadline passes or its stopped callable returns true.
+    """
+
+    def __init__(self, win_k=6, stones_per_move=2, max_depth=5, node_budget=20000, max_moves=16):
+        self.win_k = win_k
+        self.stones_per_move = stones_per_move
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.max_moves = max_moves
+        self.nodes = 0
+        self._failed = {}
+        self._deadline = float('inf')
+        self._stopped = None
+
+    def _windows(self, board_grid, player, opp_player, min_count):
+        """Windows through the player's stones with min_count+ of them and none of opp_player's."""
+        N = len(board_grid)
+        if getattr(board_grid, "stones", None) is not None:
+            # SparseBoard: visit the stones instead of flattening the board
+            return self._scan_windows(board_grid, stones_of(board_grid, player), player, opp_player, min_count)
+        windows, cell_windows = window_layout(N, self.win_k)
+        flat = [v for row in board_grid for v in row]
+        seen = set()
+        found = []
+        for i, v in enumerate(flat):
+            if v != player:
+                continue
+            for w in cell_windows[i]:
+                if w in seen:
+                    continue
+                seen.add(w)
+                values = [flat[j] for j in windows[w]]
+                if opp_player in values:
+                    continue
+                count = values.count(player)
+                if count >= min_count:
+                    found.append((count, tuple(divmod(j, N) for j in windows[w] if flat[j] == 0)))
+        return found
+
+    def _threats_through(self, board_grid, cells, player, opp_player):
+        """Threat windows of player that pass through any of the given cells."""
+        N = len(board_grid)
+        if getattr(board_grid, "stones", None) is not None:
+            return [empties for _, empties in
+                    self._scan_windows(board_grid, cells, player, opp_player, self.win_k - 2)]
+        windows, cell_windows = window_layout(N, self.win_k)
+        seen = set()
+        threats = []
+        for r, c in cells:
+            for w in cell_windows[r * N + c]:
+                if w in seen:
+                    continue
+                seen.add(w)
+                values = [board_grid[j // N][j % N] for j in windows[w]]
+                if opp_player not in values and values.count(player) >= self.win_k - 2:
+                    threats.append(tuple(divmod(j, N) for j, v in zip(windows[w], values) if v == 0))
+        return threats
+
+    def _scan_windows(self, board_grid, cells, player, opp_player, min_count):
+        """_windows for the windows through cells of a SparseGrid, with no per-board layout table."""
+        N = len(board_grid)
+        stones = board_grid.stones
+        seen = set()
+        found = []
+        for r, c in cells:
+            for key, window in _line_windows(N, self.win_k, r, c):
+                if key in seen:
+                    continue
+                seen.add(key)
+                values = [stones.get(cell, 0) for cell in window]
+                if opp_player in values:
+                    continue
+                count = values.count(player)
+                if count >= min_count:
+                    found.append((count, tuple(cell for cell, v in zip(window, values) if v == 0)))
+        return found
+
+    @staticmethod
+    def _defences(threats):
+        """
+        Pairs covering every threat; None if a single stone already does
+        (not forcing), [] if no pair can (the attacker wins).
+        """
+        cells = sorted({cell for empties in threats for cell in empties})
+        for cell in cells:
+            if all(cell in empties for empties in threats):
+                return None
+        return [pair for pair in combinations(cells, 2)
+                if all(pair[0] in empties or pair[1] in empties for empties in threats)]
+
+    def _attacks(self, board_grid, attacker, defender, their_threats, windows=None):
+        """Double-threat pairs for the attacker, each with its forced defences, best first."""
+        k = self.win_k
+        if windows is None:
+            windows = self._windows(board_grid, attacker, defender, k - 4)
+        through = {}
+        for idx, (count, empties) in enumerate(windows):
+            for cell in empties:
+                through.setdefault(cell, []).append(idx)
+        weight = {cell: sum(4 ** windows[i][0] for i in idxs) for cell, idxs in through.items()}
+        cells = sorted(through, key=lambda cell: -weight[cell])[:self.max_moves]
+        # Our pair must also answer any threat the defender has made
+        blockers = {cell for empties in their_threats for cell in empties}
+        cells += [cell for cell in sorted(blockers) if cell not in cells]
+
+        attacks = []
+        for pair in combinations(cells, 2):
+            if not all(pair[0] in empties or pair[1] in empties for empties in their_threats):
+                continue
+            threats = []
+            for idx in set(through.get(pair[0], ())) | set(through.get(pair[1], ())):
+                count, empties = windows[idx]
+                rest = tuple(cell for cell in empties if cell not in pair)
+                if count + len(empties) - len(rest) >= k - 2:
+                    threats.append(rest)
+            if len(threats) < 2:
+                continue
+            defences = self._defences(threats)
+            if defences is None:
+                continue
+            attacks.append((len(defences), -len(threats), pair, defences))
+        attacks.sort(key=lambda a: (a[0], a[1]))
+        return [(pair, defences) for _, _, pair, defences in attacks[:self.max_moves]]
+
+    def _attack(self, board_obj, attacker, defender, their_threats, depth, windows=None):
+        self.nodes += 1
+        if self.nodes > self.node_budget or time.monotonic() >= self._deadline:
+            raise _BudgetExceeded()
+        if self._stopped is not None and self._stopped():
+            raise _BudgetExceeded()
+        key = (board_obj.hash, attacker)
+        if self._failed.get(key, 0) >= depth:
+            return None
+        if depth <= 1 and windows is not None and not any(count >= self.win_k - 3 for count, _ in windows):
+            # Without a window one stone short, every threat the pair makes
+            # lies on the line through both stones, and two stones cover those
+            self._failed[key] = depth
+            return None
+        for pair, defences in self._attacks(board_obj.grid, attacker, defender, their_threats, windows):
+            if not defences:
+                return list(pair)
+            if depth <= 1:
+                continue
+            board_obj.apply_move(pair, attacker)
+            refuted = False
+            for defence in defences:
+                board_obj.apply_move(defence, defender)
+                threats = self._threats_through(board_obj.grid, defence, defender, attacker)
+                follow = self._attack(board_obj, attacker, defender, threats, depth - 1)
+                board_obj.undo_move(defence)
+                if not follow:
+                    refuted = True
+                    break
+            board_obj.undo_move(pair)
+            if not refuted:
+                return list(pair)
+        self._failed[key] = depth
+        return None
+
+    def solve(self, board_obj, attacker, defender, max_depth=None, node_budget=None, max_moves=None,
+              deadline=None, stopped=None):
+        """
+        A move that wins by force for the attacker (to move), or None if none
+        was found within the depth and node budget, before deadline (a
+        time.monotonic() value) or before stopped() returned true.
+        """
+        if self.stones_per_move != 2:
+            return None
+        grid = board_obj.grid
+        k = self.win_k
+        windows = self._windows(grid, attacker, defender, k - 4)
+        for count, empties in windows:
+            if count >= k - 2:
+                win = list(empties)
+                for cell in board_obj.candidate_cells():
+                    if len(win) >= 2:
+                        break
+                    if cell not in win:
+                        win.append(cell)
+                return win
+        their_threats = [empties for _, empties in self._windows(grid, defender, attacker, k - 2)]
+        saved = self.node_budget, self.max_moves
+        if node_budget is not None:
+            self.node_budget = node_budget
+        if max_moves is not None:
+            self.max_moves = max_moves
+        self.nodes = 0
+        self._failed = {}
+        self._deadline = float('inf') if deadline is None else deadline
+        self._stopped = stopped
+        try:
+            return self._attack(board_obj, attacker, defender, their_threats,
+                                self.max_depth if max_depth is None else max_depth, windows)
+        except _BudgetExceeded:
+            return None
+        finally:
+            self.node_budget, self.max_moves = saved
+            self._stopped = None
@@ -0,0 +1,62 @@
+# timecontrol.py
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget runs out, or on stop()."""
+
+
+def next_iteration_cost(iterations):
+    """
+    Predicted (nodes, seconds) of the next iterative-deepening depth, from the
+    (nodes, seconds) of the iterations so far: the last one grown by the
+    effective branching factor between the last two. None until two exist.
+    """
+    if len(iterations) < 2 or iterations[-2][0] == 0:
+        return None
+    ebf = iterations[-1][0] / iterations[-2][0]
+    return iterations[-1][0] * ebf, iterations[-1][1] * ebf
+
+
+class TimeManager:
+    """
+    Per-move time budget from a game clock.
+
+    The AI gets total_sec for the whole game plus increment_sec per move.
+    Each move is given the remaining clock divided by the number of moves
+    still expected (moves_to_go, never fewer than min_moves_to_go, and never
+    more than the empty board could hold), kept within [min_sec, max_sec].
+    Call allocate() before a search and spend() with the time it really took.
+    """
+
+    def __init__(self, total_sec=300.0, increment_sec=0.0, moves_to_go=30, min_moves_to_go=8,
+                 min_sec=0.2, max_sec=20.0, stones_per_move=2):
+        self.total_sec = total_sec
+        self.increment_sec = increment_sec
+        self.moves_to_go = moves_to_go
+        self.min_moves_to_go = min_moves_to_go
+        self.min_sec = min_sec
+        self.max_sec = max_sec
+        self.stones_per_move = stones_per_move
+        self.remaining = total_sec
+        self.moves = 0
+
+    def reset(self):
+        self.remaining = self.total_sec
+        self.moves = 0
+
+    def allocate(self, board_obj=None):
+        """Seconds to spend on the next move."""
+        moves_left = max(self.min_moves_to_go, self.moves_to_go - self.moves)
+        if board_obj is not None:
+            empty = board_obj.size * board_obj.size - board_obj.stone_count
+            # Our moves left if the board fills up: both players place stones
+            moves_left = min(moves_left, max(1, empty // (2 * self.stones_per_move)))
+        budget = self.remaining / moves_left + self.increment_sec
+        # Never plan to use more than is left on the clock
+        budget = min(budget, self.remaining + self.increment_sec)
+        return max(self.min_sec, min(self.max_sec, budget))
+
+    def spend(self, seconds):
+        """Charge a finished move to the clock."""
+        self.remaining = max(0.0, self.remaining - seconds) + self.increment_sec
+        self.moves += 1
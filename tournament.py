@@ -0,0 +1,264 @@
+# tournament.py
+"""
+Headless engine-vs-engine matches.
+
+    python tournament.py --a AlphaBeta,depth=3,time=1 --b Minimax,depth=2,time=1 --games 200
+
+Each player is an engine name followed by key=value settings (heuristic,
+depth, time, candidates, plus any keyword the engine's constructor takes).
+Games start from random openings near the centre and are played in pairs
+with the colours swapped, each game in its own worker process through
+GameController and two AI_Players. The report gives wins/draws/losses from
+A's side, A's Elo difference over B with a 95% interval, and average time
+per move. With --record the games are also saved as game records (see
+gamerecord.py) for analyse.py.
+"""
+
+import argparse
+import inspect
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from board import Board
+from controller import GameController
+from gamerecord import GameRecord, GameWriter
+from Ai_Player import AI_Player
+from alphabeta import AlphaBeta
+from minimax import Minimax
+from mcts import MCTS
+from heuristics import heuristic1, heuristic2
+from patterns import PatternHeuristic
+
+HEURISTICS = {"heuristic1": heuristic1, "heuristic2": heuristic2, "pattern": PatternHeuristic}
+
+
+def parse_player(spec):
+    """'AlphaBeta,depth=3,time=1' -> {'engine': 'AlphaBeta', 'depth': 3, 'time': 1.0}"""
+    name, *options = spec.split(",")
+    config = {"engine": name.strip()}
+    for option in options:
+        key, _, value = option.partition("=")
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                pass
+        config[key.strip()] = value
+    return config
+
+
+def format_player(config):
+    """Inverse of parse_player."""
+    options = [f"{key}={value}" for key, value in config.items() if key != "engine"]
+    return ",".join([config["engine"]] + options)
+
+
+def _check_options(engine_cls, name, options):
+    """Reject spec keys the engine's constructor does not take ("candidates" is mapped)."""
+    accepted = set(inspect.signature(engine_cls).parameters) | {"candidates"}
+    for key in options:
+        if key not in accepted:
+            raise ValueError(f"{name} does not take option {key}")
+
+
+def make_engine(config, win_k=6):
+    """Build a search engine from a parse_player config."""
+    options = dict(config)
+    name = options.pop("engine")
+    time_limit = options.pop("time", 1.0)
+    if name == "MCTS":
+        _check_options(MCTS, name, options)
+        return MCTS(time_limit_sec=time_limit, win_k=win_k,
+                    max_candidates=options.pop("candidates", 12), **options)
+    heuristic = HEURISTICS[options.pop("heuristic", "heuristic2")]
+    if isinstance(heuristic, type):
+        heuristic = heuristic()
+    engines = {"AlphaBeta": AlphaBeta, "Minimax": Minimax}
+    if name not in engines:
+        raise ValueError(f"unknown engine {name!r}")
+    max_depth = options.pop("depth", 2)
+    _check_options(engines[name], name, options)
+    return engines[name](max_depth=max_depth, heuristic_func=heuristic, win_k=win_k,
+                         time_limit_sec=time_limit, max_candidates=options.pop("candidates", 12),
+                         **options)
+
+
+def random_opening(size, plies, rng):
+    """
+    Moves for the first plies turns (one stone, then pairs), placed at random
+    within a few cells of the centre.
+    """
+    center = size // 2
+    spread = max(2, size // 6)
+    cells = [(r, c) for r in range(center - spread, center + spread + 1)
+             for c in range(center - spread, center + spread + 1)
+             if 0 <= r < size and 0 <= c < size]
+    rng.shuffle(cells)
+    moves = []
+    for ply in range(plies):
+        n = 1 if ply == 0 else 2
+        moves.append([cells.pop() for _ in range(n)])
+    return moves
+
+
+def play_game(config_a, config_b, a_is_black, opening, size, max_moves):
+    """
+    Play one game in this process. Returns A's result (1, 0.5 or 0), the
+    number of moves, A's and B's total thinking time and move count, and
+    the game as a GameRecord.
+    """
+    board = Board(size)
+    engine_a = make_engine(config_a, board.win_k)
+    engine_b = make_engine(config_b, board.win_k)
+    player_a = AI_Player(1 if a_is_black else 2, engine_a)
+    player_b = AI_Player(2 if a_is_black else 1, engine_b)
+    black, white = (player_a, player_b) if a_is_black else (player_b, player_a)
+    controller = GameController(board, black, white, first_move_single=True)
+
+    for move in opening:
+        controller.board.apply_move(move, controller.current_player.color)
+        controller._moves_played += 1
+        controller.switch_player()
+
+    clock = {id(player_a): [0.0, 0], id(player_b): [0.0, 0]}
+    result = 0.5
+    while not controller.game_over and controller._moves_played < max_moves:
+        mover = controller.current_player
+        start = time.perf_counter()
+        move, _ = controller.ai_move()
+        clock[id(mover)][0] += time.perf_counter() - start
+        clock[id(mover)][1] += 1
+        if not move:
+            # No move found: count it as a loss for the side that failed
+            result = 0.0 if mover is player_a else 1.0
+            break
+    else:
+        if controller.winner is not None:
+            result = 1.0 if controller.winner is player_a else 0.0
+    for engine in (engine_a, engine_b):
+        if hasattr(engine, "close"):
+            engine.close()
+    if result == 0.5:
+        winner = "draw" if controller.game_over else None  # None: stopped at max_moves
+    else:
+        winner = player_a.color if result == 1.0 else player_b.color
+    config_black, config_white = (config_a, config_b) if a_is_black else (config_b, config_a)
+    record = GameRecord.from_board(controller.board, winner,
+                                   tag=f"{format_player(config_black)} vs {format_player(config_white)}")
+    return result, controller._moves_played, clock[id(player_a)], clock[id(player_b)], record
+
+
+def elo(score, games):
+    """Elo difference for a score fraction, clamped away from 0 and 1."""
+    p = min(max(score / games, 0.5 / games), 1 - 0.5 / games)
+    return -400 * math.log10(1 / p - 1)
+
+
+def elo_interval(results):
+    """(elo, low, high): Elo difference with a 95% interval from the per-game score spread."""
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((x - mean) ** 2 for x in results) / n
+    if variance == 0:
+        # Every game ended the same way; fall back to the binomial spread of the clamped score
+        p = min(max(mean, 0.5 / n), 1 - 0.5 / n)
+        variance = p * (1 - p)
+    margin = 1.96 * math.sqrt(variance / n)
+    return elo(mean * n, n), elo((mean - margin) * n, n), elo((mean + margin) * n, n)
+
+
+def run(config_a, config_b, games=100, workers=None, size=19, opening_plies=2, max_moves=200, seed=None,
+        out=sys.stderr, record_path=None):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(0, games, 2):
+        opening = random_opening(size, opening_plies, rng)
+        jobs.append((opening, True))
+        if i + 1 < games:
+            jobs.append((opening, False))
+
+    results, lengths = [], []
+    time_a = [0.0, 0]
+    time_b = [0.0, 0]
+    writer = GameWriter(record_path) if record_path else None
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(play_game, config_a, config_b, a_is_black, opening, size, max_moves)
+                   for opening, a_is_black in jobs]
+        for future in as_completed(futures):
+            result, length, clock_a, clock_b, record = future.result()
+            if writer is not None:
+                writer.write(record)
+            results.append(result)
+            lengths.append(length)
+            time_a = [time_a[0] + clock_a[0], time_a[1] + clock_a[1]]
+            time_b = [time_b[0] + clock_b[0], time_b[1] + clock_b[1]]
+            print(f"game {len(results)}/{len(jobs)}: {'win' if result == 1 else 'loss' if result == 0 else 'draw'}"
+                  f" in {length} moves", file=out)
+    if writer is not None:
+        writer.close()
+
+    wins = results.count(1.0)
+    draws = results.count(0.5)
+    losses = results.count(0.0)
+    diff, low, high = elo_interval(results)
+    return {
+        "a": config_a,
+        "b": config_b,
+        "games": len(results),
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "score": sum(results) / len(results),
+        "elo": round(diff, 1),
+        "elo_low": round(low, 1),
+        "elo_high": round(high, 1),
+        "avg_moves": sum(lengths) / len(lengths),
+        "a_sec_per_move": time_a[0] / time_a[1] if time_a[1] else None,
+        "b_sec_per_move": time_b[0] / time_b[1] if time_b[1] else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play two engine configurations against each other.")
+    parser.add_argument("--a", required=True, help="player A, e.g. AlphaBeta,heuristic=pattern,depth=3,time=1")
+    parser.add_argument("--b", required=True, help="player B, same format")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--opening-plies", type=int, default=2, help="random moves before the engines take over")
+    parser.add_argument("--max-moves", type=int, default=200, help="moves before a game is scored a draw")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="also write the report here as JSON")
+    parser.add_argument("--record", help="append the games to this game record file")
+    args = parser.parse_args(argv)
+    config_a, config_b = parse_player(args.a), parse_player(args.b)
+    for config in (config_a, config_b):
+        try:
+            make_engine(config)  # a bad spec fails here, not in every worker
+        except ValueError as e:
+            parser.error(str(e))
+
+    report = run(config_a, config_b, args.games, args.workers, args.size,
+                 args.opening_plies, args.max_moves, args.seed, record_path=args.record)
+    print(f"\nA: {args.a}\nB: {args.b}")
+    print(f"A wins {report['wins']}, draws {report['draws']}, losses {report['losses']} "
+          f"over {report['games']} games (score {report['score']:.3f})")
+    print(f"Elo A - B: {report['elo']:+.1f}  (95%: {report['elo_low']:+.1f} .. {report['elo_high']:+.1f})")
+    a_time = report['a_sec_per_move']
+    b_time = report['b_sec_per_move']
+    print(f"avg time per move: A {a_time or 0:.3f}s, B {b_time or 0:.3f}s; "
+          f"avg game length {report['avg_moves']:.1f} moves")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
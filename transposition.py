@@ -0,0 +1,212 @@
+# transposition.py
+
+import mmap
+import os
+import struct
+import zlib
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# XORed into the board hash when the minimizing side is to move
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+
+def make_table(buckets, path=None, tag=""):
+    """
+    The table an engine searches with: in memory, or in the file at path
+    (see DiskTranspositionTable) when one is given. None when buckets is 0.
+    """
+    if not buckets:
+        return None
+    if path:
+        return DiskTranspositionTable(path, buckets, tag=tag)
+    return TranspositionTable(buckets)
+
+
+def evaluator_tag(heuristic_func):
+    """
+    What a table tag records of an evaluator: its cache_tag() when it has
+    one (so differently weighted instances differ), else its qualified name.
+    """
+    cache_tag = getattr(heuristic_func, "cache_tag", None)
+    if cache_tag is not None:
+        return cache_tag()
+    return getattr(heuristic_func, "__qualname__", type(heuristic_func).__qualname__)
+
+
+class TranspositionTable:
+    """
+    Bounded hash table of searched positions.
+    Each bucket has two slots: a depth-preferred slot that only gives way to an
+    equal or deeper search (or an entry from an older search), and an
+    always-replace slot for everything else.
+    Entries are tuples (key, depth, flag, score, best_move, age), best_move
+    being a Board.encode_move code or None.
+    """
+
+    def __init__(self, buckets=1 << 18):
+        self.buckets = max(1, int(buckets))
+        self.slots = [None] * (2 * self.buckets)
+        self.age = 0
+
+    def new_search(self):
+        """Mark the start of a new choose_move; older entries become replaceable."""
+        self.age += 1
+
+    def clear(self):
+        self.slots = [None] * (2 * self.buckets)
+
+    def probe(self, key):
+        """Return the entry stored for key, or None."""
+        i = (key % self.buckets) * 2
+        entry = self.slots[i]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.slots[i + 1]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        i = (key % self.buckets) * 2
+        entry = (key, depth, flag, score, best_move, self.age)
+        old = self.slots[i]
+        if old is None or old[0] == key or old[1] <= depth or old[5] != self.age:
+            self.slots[i] = entry
+        else:
+            self.slots[i + 1] = entry
+
+    def __len__(self):
+        return sum(1 for e in self.slots if e is not None)
+
+
+class DiskTranspositionTable:
+    """
+    TranspositionTable kept in a memory-mapped file, so the search results
+    of one move, game or process are there for the next.
+
+    The file holds a header and a fixed number of two-slot buckets (its
+    size limit; an existing file keeps the bucket count it was made with).
+    The search age lives in the header, so every process sharing the file
+    counts searches together; entries from more than max_age searches ago
+    are treated as empty. Writers do not lock: each record stores its key
+    XORed with a checksum of the rest, and a record torn by a concurrent
+    write fails the check and reads as a miss. tag separates engines whose
+    scores mean different things (another heuristic, say) in one file, and
+    set_size adds the board size to it before a search.
+    """
+
+    MAGIC = b"C6TT"
+    VERSION = 3
+    HEADER = struct.Struct("<4sIQQ")  # magic, version, buckets, age
+    HEADER_SIZE = 32
+    # check, score, age, depth, best move code (-1 for none), flag + 1 (0 = empty)
+    RECORD = struct.Struct("<QdIhqB1x")
+    FLAG_OFFSET = 30
+
+    def __init__(self, path, buckets=1 << 18, max_age=1000, tag=""):
+        self.path = path
+        self.max_age = max_age
+        self.tag = tag
+        self.size = None
+        self.salt = self._salt(tag)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        self._file = os.fdopen(fd, "r+b")
+        version = None
+        if os.fstat(fd).st_size >= self.HEADER_SIZE:
+            magic, version, stored, _ = self.HEADER.unpack(self._file.read(self.HEADER.size))
+            if magic != self.MAGIC:
+                self._file.close()
+                raise ValueError(f"{path} is not a transposition table file")
+        if version == self.VERSION:
+            buckets = stored
+        else:
+            # New file, or one in an older record layout: it is only a cache, so start over
+            buckets = max(1, int(buckets))
+            self._file.seek(0)
+            self._file.truncate(0)
+            self._file.truncate(self.HEADER_SIZE + 2 * buckets * self.RECORD.size)
+            self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, buckets, 0))
+            self._file.flush()
+        self.buckets = buckets
+        self._map = mmap.mmap(self._file.fileno(), self.HEADER_SIZE + 2 * buckets * self.RECORD.size)
+        self.age = self.HEADER.unpack_from(self._map, 0)[3]
+
+    @staticmethod
+    def _salt(tag):
+        return zlib.crc32(tag.encode()) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF
+
+    def set_size(self, size):
+        """
+        Key entries by board size too: move codes and the empty board's hash
+        mean different things on another size.
+        """
+        if size != self.size:
+            self.size = size
+            self.salt = self._salt(f"{self.tag}:{size}")
+
+    def new_search(self):
+        self.age = self.HEADER.unpack_from(self._map, 0)[3] + 1
+        struct.pack_into("<Q", self._map, 16, self.age)
+
+    def sync_age(self):
+        """Take up the age another process sharing the file set with new_search."""
+        self.age = self.HEADER.unpack_from(self._map, 0)[3]
+
+    def clear(self):
+        start = self.HEADER_SIZE
+        self._map[start:] = bytes(len(self._map) - start)
+
+    def _offset(self, key, slot):
+        return self.HEADER_SIZE + ((key % self.buckets) * 2 + slot) * self.RECORD.size
+
+    def _read(self, offset, key):
+        """(depth, flag, score, best_move, age) at offset if it holds key, else None."""
+        record = self._map[offset:offset + self.RECORD.size]
+        check, score, age, depth, best_move, flag = self.RECORD.unpack(record)
+        if not flag or check ^ zlib.crc32(record[8:]) != key:
+            return None
+        return depth, flag - 1, score, best_move if best_move >= 0 else None, age
+
+    def probe(self, key):
+        key ^= self.salt
+        for slot in (0, 1):
+            entry = self._read(self._offset(key, slot), key)
+            if entry is not None and (self.age - entry[4]) & 0xFFFFFFFF <= self.max_age:
+                return (key ^ self.salt,) + entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        key ^= self.salt
+        payload = self.RECORD.pack(0, score, self.age & 0xFFFFFFFF, depth,
+                                   -1 if best_move is None else best_move, flag + 1)[8:]
+        record = struct.pack("<Q", key ^ zlib.crc32(payload)) + payload
+        offset = self._offset(key, 0)
+        _, _, age, old_depth, _, used = self.RECORD.unpack_from(self._map, offset)
+        # Same rule as TranspositionTable: a deeper entry from this search keeps the first slot
+        if used and old_depth > depth and age == self.age & 0xFFFFFFFF and self._read(offset, key) is None:
+            offset = self._offset(key, 1)
+        self._map[offset:offset + self.RECORD.size] = record
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    def __getstate__(self):
+        # Engines are pickled into worker processes; each reopens the file
+        return dict(path=self.path, buckets=self.buckets, max_age=self.max_age, tag=self.tag, size=self.size)
+
+    def __setstate__(self, state):
+        size = state.pop("size", None)
+        self.__init__(**state)
+        if size is not None:
+            self.set_size(size)
+
+    def __len__(self):
+        return sum(1 for i in range(2 * self.buckets)
+                   if self._map[self.HEADER_SIZE + i * self.RECORD.size + self.FLAG_OFFSET])